@@ -1,8 +1,14 @@
+from Cayley.adjacency import *
+from Cayley.features import *
 from Cayley.abstractnetwork import *
+from Cayley.views import *
 from Cayley.cayleytree import *
 from Cayley.graph import *
 from Cayley.lattice import *
+from Cayley.randomgraphs import *
+from Cayley.history import *
 from Cayley.montecarlo import *
+from Cayley.factory import *
 
 
 
@@ -0,0 +1,613 @@
+"""
+Filename: adjacency.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the adjacency classes that back the links of a network. Every class
+answers the same questions (neighbors, degrees, neighborSums, edges, ...) by
+the integer id of a node, so simulations can use any of them. They share the
+scipy matrices and Laplacians of the Adjacency base class.
+
+CSRAdjacency is a compiled, read-only view of the links of a network in
+compressed sparse row form. The neighbors of the node in row i
+are indices[indptr[i]:indptr[i+1]], where a row is the id of the node in
+the network. It can also be handed out as a scipy.sparse matrix when scipy
+is installed. The arrays are contiguous integers, so array based kernels can
+walk the neighbors of every node without touching Python sets.
+
+CompleteAdjacency is an implicit all-to-all topology. It stores nothing, and
+neighbor sums are computed in closed form as the total minus the node itself.
+
+TreeAdjacency is an implicit Cayley tree. Nodes are numbered generation by
+generation, so the parent, children and generation of a node follow from
+index arithmetic on the generation offsets and nothing is stored per node.
+
+StencilAdjacency is an implicit hypercubic grid. A node is linked to the next
+and previous cell along every axis, with open or periodic boundaries per
+axis, and neighbor sums are taken by shifting the whole state grid.
+
+SubAdjacency is the induced subgraph of any of these on a subset of rows. It
+stores only the rows and answers through the adjacency it was taken from.
+"""
+
+__all__ = ['Adjacency','CSRAdjacency','CompleteAdjacency','TreeAdjacency',
+           'StencilAdjacency','SubAdjacency']
+
+import numpy as np
+try:
+    import scipy.sparse as sparse
+except ImportError: #scipy is optional, the arrays work on their own
+    sparse = None
+
+class Adjacency(object):
+    """The methods every adjacency shares. Each class gives its own edges,
+    degrees and neighborSums; an implicit one is materialized once into the
+    CSRAdjacency kept in _csr when it is asked for a scipy matrix."""
+
+    def toCSR(self):
+        """Materializes the links as a CSRAdjacency."""
+        if self._csr is None:
+            self._csr = CSRAdjacency.fromEdges(self.edges(),len(self))
+        return self._csr
+
+    def toScipy(self,form = 'csr'):
+        """Returns the adjacency as a scipy.sparse matrix in 'csr' or 'coo'
+        form. Raises ImportError if scipy is not installed."""
+        if sparse is None:
+            raise ImportError("scipy is needed for scipy.sparse matrices.")
+        csr = self.toCSR()
+        data = np.ones(len(csr.indices),dtype = np.int32)
+        matrix = sparse.csr_matrix((data,csr.indices,csr.indptr),
+                                   shape = (len(self),len(self)))
+        return matrix.asformat(form)
+
+    def laplacian(self,normalized = False,form = 'csr'):
+        """Returns the graph Laplacian D - A as a scipy.sparse matrix. The
+        normalized Laplacian is I - D^-1/2 A D^-1/2, where isolated nodes
+        get a zero row. Raises ImportError if scipy is not installed."""
+        adjacency = self.toScipy('csr').astype(float)
+        degrees = self.degrees().astype(float)
+        if normalized:
+            scale = np.zeros(len(degrees))
+            scale[degrees > 0] = 1/np.sqrt(degrees[degrees > 0])
+            scale = sparse.diags(scale)
+            identity = sparse.diags((degrees > 0).astype(float))
+            return (identity - scale @ adjacency @ scale).asformat(form)
+        return (sparse.diags(degrees) - adjacency).asformat(form)
+
+    def laplacianDot(self,values):
+        """Returns (D - A) @ values without building a matrix, so spectral
+        and diffusion kernels work when scipy is not installed."""
+        values = np.asarray(values)
+        return self.degrees()*values - self.neighborSums(values)
+
+class CSRAdjacency(Adjacency):
+    """A read-only compressed sparse row adjacency. Needs the indptr array of
+    length n+1 and the indices array of length 2E for a network with n nodes
+    and E undirected links."""
+
+    def __init__(self,indptr,indices):
+        """Stores the two arrays as int32 and locks them from writing."""
+        dtype = np.int32 if len(indices) < 2**31 else np.int64
+        self.indptr = np.ascontiguousarray(indptr,dtype = dtype)
+        self.indices = np.ascontiguousarray(indices,dtype = np.int32)
+        self.indptr.setflags(write = False)
+        self.indices.setflags(write = False)
+        self._edges = None
+
+    @classmethod
+    def fromEdges(cls,edges,size):
+        """Builds the adjacency from an (E,2) array of undirected links between
+        rows 0 to size-1. Each link is stored in both directions and the
+        neighbors of each row are sorted."""
+        edges = np.asarray(edges,dtype = np.int64).reshape(-1,2)
+        rows = np.concatenate([edges[:,0],edges[:,1]])
+        cols = np.concatenate([edges[:,1],edges[:,0]])
+        order = np.argsort(rows*max(size,1) + cols) #by row, then column
+        indptr = np.zeros(size+1,dtype = np.int64)
+        np.cumsum(np.bincount(rows,minlength = size),out = indptr[1:])
+        return cls(indptr,cols[order])
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the adjacency."""
+        return len(self.indptr) - 1
+
+    def __eq__(self,other):
+        """Two adjacencies are equal when they store the same links."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return np.array_equal(self.indptr,other.indptr) and \
+               np.array_equal(self.indices,other.indices)
+
+    def neighbors(self,row):
+        """Returns a view of the rows linked to the row given."""
+        return self.indices[self.indptr[row]:self.indptr[row+1]]
+
+    def degree(self,row):
+        """Returns the degree of one row."""
+        return int(self.indptr[row+1] - self.indptr[row])
+
+    def degrees(self):
+        """Returns an array with the degree of every row."""
+        return np.diff(self.indptr)
+
+    def edgeCount(self):
+        """Returns the number of undirected links."""
+        return len(self.indices)//2
+
+    def neighborSums(self,values):
+        """Takes an array with one value per row and returns an array with
+        the sum of the values of the neighbors of every row.
+
+        This algorithm has a running time of $O(n+E)$ and does no Python
+        level work per node."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        sums = np.zeros(len(self),dtype = values.dtype)
+        starts = self.indptr[:-1]
+        linked = self.indptr[1:] > starts #reduceat would copy into empty rows
+        if linked.any():
+            sums[linked] = np.add.reduceat(values[self.indices],starts[linked])
+        return sums
+
+    def toCSR(self):
+        """Returns self, since the adjacency is already in CSR form."""
+        return self
+
+    def rows(self):
+        """Returns an array with the row of every entry of indices, so that
+        (rows(), indices) is the adjacency in coordinate (COO) form."""
+        return np.repeat(np.arange(len(self),dtype = self.indices.dtype),
+                         self.degrees())
+
+    def edges(self):
+        """Returns a read-only (E,2) array with every undirected link once, as
+        (i,j) with i < j, sorted by i and then j. It is computed in $O(E)$ the
+        first time and kept, since the adjacency never changes."""
+        if self._edges is None:
+            rows = self.rows()
+            upper = rows < self.indices
+            self._edges = np.column_stack((rows[upper],self.indices[upper]))
+            self._edges.setflags(write = False)
+        return self._edges
+
+    def bandwidth(self):
+        """Returns the largest distance between the ids of two linked rows.
+        Small bandwidth means neighbors sit close together in memory."""
+        if not len(self.indices):
+            return 0
+        return int(np.abs(self.rows().astype(np.int64) - self.indices).max())
+
+    def permuted(self,order):
+        """Returns the adjacency with the rows relabeled, where order[i] is
+        the old row that becomes row i."""
+        rank = np.empty(len(self),dtype = np.int64)
+        rank[order] = np.arange(len(self))
+        return CSRAdjacency.fromEdges(rank[self.edges()],len(self))
+
+    def ordering(self,method = 'rcm'):
+        """Returns an array with the rows in breadth first order. 'bfs' visits
+        each component from its lowest row and the neighbors of a row in
+        row order. 'rcm' is reverse Cuthill-McKee: each component starts at
+        a row of lowest degree, the neighbors of a row are visited from the
+        lowest degree up, and the whole order is reversed. Both keep linked
+        rows close together.
+
+        Each level of the search is expanded with array operations, so the
+        Python work is per level and per component, not per row."""
+        if method not in ('bfs','rcm'):
+            raise ValueError("Ordering must be 'bfs' or 'rcm'.")
+        degrees = self.degrees()
+        visited = np.zeros(len(self),dtype = bool)
+        starts = np.argsort(degrees,kind = 'stable') if method == 'rcm' \
+                 else np.arange(len(self))
+        levels = list()
+        for start in starts.tolist():
+            if visited[start]:
+                continue
+            frontier = np.array([start],dtype = np.int64)
+            visited[start] = True
+            while len(frontier):
+                levels.append(frontier)
+                counts = degrees[frontier]
+                first = np.repeat(self.indptr[frontier] - np.cumsum(counts) +
+                                  counts,counts)
+                neighbors = self.indices[first + np.arange(len(first))]
+                if method == 'rcm': #lowest degree first within each parent
+                    parents = np.repeat(np.arange(len(frontier)),counts)
+                    neighbors = neighbors[np.lexsort((degrees[neighbors],
+                                                      parents))]
+                neighbors = neighbors[~visited[neighbors]]
+                seen = np.unique(neighbors,return_index = True)[1]
+                frontier = neighbors[np.sort(seen)].astype(np.int64)
+                visited[frontier] = True
+        order = np.concatenate(levels) if levels else \
+                np.zeros(0,dtype = np.int64)
+        return order[::-1].copy() if method == 'rcm' else order
+
+class CompleteAdjacency(Adjacency):
+    """An implicit complete graph on a number of rows. Every row is linked to
+    every other row, but no links are stored."""
+
+    def __init__(self,size):
+        """Sets the number of rows."""
+        self.size = size
+        self._csr = None
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the adjacency."""
+        return self.size
+
+    def __eq__(self,other):
+        """Two complete adjacencies are equal when they have the same size."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.size == other.size
+
+    def neighbors(self,row):
+        """Returns an array with every row except the row given."""
+        others = np.arange(self.size - 1,dtype = np.int32)
+        others[row:] += 1
+        return others
+
+    def degree(self,row):
+        """Returns the degree of one row."""
+        return self.size - 1
+
+    def degrees(self):
+        """Returns an array with the degree of every row."""
+        return np.full(self.size,self.size - 1,dtype = np.int64)
+
+    def edgeCount(self):
+        """Returns the number of undirected links."""
+        return self.size*(self.size - 1)//2
+
+    def neighborSums(self,values):
+        """Returns the sum of the values of the neighbors of every row, as the
+        total of all values minus the value of the row itself.
+
+        This algorithm has a running time of $O(n)$, or $O(1)$ per node."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        return values.sum() - values
+
+    def laplacianDot(self,values):
+        """Returns (D - A) @ values, which is n*values minus their total."""
+        values = np.asarray(values)
+        return self.size*values - values.sum()
+
+    def edges(self):
+        """Returns the (E,2) array of all links in sorted order. This stores
+        all $O(n^2)$ links, so it is only meant for small networks."""
+        return np.column_stack(np.triu_indices(self.size,k = 1))
+
+class TreeAdjacency(Adjacency):
+    """An implicit Cayley tree with a number of generations and links per
+    node. Node 0 is the center, its links children are nodes 1 to links and
+    every later node has links-1 children, numbered in order after them."""
+
+    def __init__(self,generations,links):
+        """Sets up the generation offsets of the tree."""
+        self.generations = generations
+        self.links = links
+        sizes = [1] + [links*(links-1)**(x-1) for x in range(1,generations+1)]
+        self.offsets = np.zeros(generations+2,dtype = np.int64)
+        np.cumsum(sizes,out = self.offsets[1:])
+        self.size = int(self.offsets[-1])
+        self.branching = max(links-1,1)
+        #nodes 1 to inner are the nodes past the center that have children
+        self.inner = int(self.offsets[-2]) - 1 if generations > 1 and \
+                     links > 1 else 0
+        self._csr = None
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the adjacency."""
+        return self.size
+
+    def __eq__(self,other):
+        """Two trees are equal when they have the same shape."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.generations == other.generations and \
+               self.links == other.links
+
+    def generation(self,nodes):
+        """Returns the generation of a node or an array of nodes."""
+        return np.searchsorted(self.offsets,nodes,side = 'right') - 1
+
+    def parent(self,nodes):
+        """Returns the parent of a node or an array of nodes, where the center
+        has the parent -1."""
+        nodes = np.asarray(nodes,dtype = np.int64)
+        parents = (nodes - self.links - 1)//self.branching + 1
+        parents = np.where(nodes > self.links,parents,0)
+        return np.where(nodes > 0,parents,-1)
+
+    def firstChild(self,nodes):
+        """Returns the first child of a node or an array of nodes, where nodes
+        in the last generation have -1. A node's children are the
+        childCount(node) nodes starting at its first child."""
+        nodes = np.asarray(nodes,dtype = np.int64)
+        first = self.links + 1 + (nodes - 1)*self.branching
+        first = np.where(nodes == 0,1,first)
+        return np.where(self.childCount(nodes) > 0,first,-1)
+
+    def childCount(self,nodes):
+        """Returns the number of children of a node or an array of nodes."""
+        nodes = np.asarray(nodes,dtype = np.int64)
+        inner = (nodes >= 1) & (nodes <= self.inner)
+        counts = np.where(inner,self.links-1,0)
+        return np.where((nodes == 0) & (self.generations > 0),self.links,counts)
+
+    def neighbors(self,row):
+        """Returns an array with the parent and the children of a row."""
+        first = int(self.firstChild(row))
+        children = np.arange(first,first + int(self.childCount(row)),
+                             dtype = np.int32)
+        if row == 0:
+            return children
+        return np.concatenate(([int(self.parent(row))],children)).astype(np.int32)
+
+    def degree(self,row):
+        """Returns the degree of one row."""
+        return int(self.childCount(row)) + (row > 0)
+
+    def degrees(self):
+        """Returns an array with the degree of every row."""
+        return self.childCount(np.arange(self.size)) + \
+               (np.arange(self.size) > 0)
+
+    def edgeCount(self):
+        """Returns the number of undirected links."""
+        return self.size - 1
+
+    def neighborSums(self,values):
+        """Returns the sum of the values of the neighbors of every row. The
+        children of each node are a contiguous block, so the sums are taken
+        over reshaped blocks without any gather.
+
+        This algorithm has a running time of $O(n)$."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        sums = np.zeros_like(values)
+        if self.size == 1:
+            return sums
+        links,inner = self.links,self.inner
+        sums[0] = values[1:links+1].sum()
+        sums[1:links+1] += values[0]
+        if inner > 0:
+            blocks = values[links+1:].reshape(inner,links-1)
+            sums[1:inner+1] += blocks.sum(axis = 1)
+            sums[links+1:] += np.repeat(values[1:inner+1],links-1)
+        return sums
+
+    def edges(self):
+        """Returns the (E,2) array of (parent,child) links, which is already
+        in sorted order."""
+        child = np.arange(1,self.size,dtype = np.int64)
+        return np.column_stack((self.parent(child),child))
+
+class StencilAdjacency(Adjacency):
+    """An implicit grid with the given shape, in C order, so the last axis
+    changes fastest between node ids. periodic is a bool for every axis, or
+    one bool for all of them. An axis of size 1 adds no links and a periodic
+    axis of size 2 adds the same single link as an open one."""
+
+    def __init__(self,shape,periodic = False):
+        """Sets the shape and the boundary of each axis."""
+        self.shape = tuple(int(n) for n in shape)
+        if isinstance(periodic,(bool,np.bool_)):
+            periodic = (periodic,)*len(self.shape)
+        if len(periodic) != len(self.shape):
+            raise ValueError("Need one boundary per axis.")
+        self.periodic = tuple(bool(p) for p in periodic)
+        self.size = int(np.prod(self.shape,dtype = np.int64))
+        self._csr = None
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the adjacency."""
+        return self.size
+
+    def __eq__(self,other):
+        """Two grids are equal when they have the same shape and boundaries."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.shape == other.shape and self.periodic == other.periodic
+
+    def _wraps(self,axis):
+        """Returns True if the axis links its last cell to its first."""
+        return self.periodic[axis] and self.shape[axis] > 2
+
+    def neighbors(self,row):
+        """Returns a sorted array with the neighbors of a row."""
+        cell = np.unravel_index(row,self.shape)
+        found = set()
+        for axis,n in enumerate(self.shape):
+            for step in (-1,1):
+                position = cell[axis] + step
+                if self._wraps(axis):
+                    position %= n
+                elif not 0 <= position < n:
+                    continue
+                neighbor = list(cell)
+                neighbor[axis] = position
+                found.add(int(np.ravel_multi_index(neighbor,self.shape)))
+        found.discard(row)
+        return np.array(sorted(found),dtype = np.int32)
+
+    def degree(self,row):
+        """Returns the degree of one row."""
+        return len(self.neighbors(row))
+
+    def degrees(self):
+        """Returns an array with the degree of every row."""
+        return self.neighborSums(np.ones(self.size,dtype = np.int64))
+
+    def edgeCount(self):
+        """Returns the number of undirected links."""
+        count = 0
+        for axis,n in enumerate(self.shape):
+            pairs = n if self._wraps(axis) else max(n-1,0)
+            count += pairs*(self.size//n if n else 0)
+        return count
+
+    def neighborSums(self,values):
+        """Returns the sum of the values of the neighbors of every row. The
+        values are viewed as a grid and the sums along each axis are added
+        up. A grid shaped input gives a grid shaped result.
+
+        This algorithm has a running time of $O(n d)$ for d axes."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        grid = values.reshape(self.shape)
+        sums = np.zeros_like(grid)
+        for axis in range(len(self.shape)):
+            self._addAxis(grid,sums,axis)
+        return sums.reshape(values.shape)
+
+    def axisSums(self,values,axis):
+        """Returns the sum of the values of the two neighbors of every row
+        along one axis, in the shape of the values."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        grid = values.reshape(self.shape)
+        sums = np.zeros_like(grid)
+        self._addAxis(grid,sums,axis)
+        return sums.reshape(values.shape)
+
+    def _addAxis(self,grid,sums,axis):
+        """Adds to sums the grid shifted by one cell both ways along an axis,
+        with np.roll on a periodic axis and slicing on an open one."""
+        if self.shape[axis] < 2:
+            return
+        if self._wraps(axis):
+            sums += np.roll(grid,1,axis = axis)
+            sums += np.roll(grid,-1,axis = axis)
+        else:
+            lower = [slice(None)]*len(self.shape)
+            upper = [slice(None)]*len(self.shape)
+            lower[axis] = slice(None,-1)
+            upper[axis] = slice(1,None)
+            sums[tuple(upper)] += grid[tuple(lower)]
+            sums[tuple(lower)] += grid[tuple(upper)]
+
+    def laplacianDot(self,values):
+        """Returns (D - A) @ values without building a matrix."""
+        values = np.asarray(values)
+        return self.degrees().reshape(values.shape)*values - \
+               self.neighborSums(values)
+
+    def edges(self):
+        """Returns the (E,2) array of links in sorted order."""
+        grid = np.arange(self.size,dtype = np.int64).reshape(self.shape)
+        pairs = list()
+        for axis,n in enumerate(self.shape):
+            if n < 2:
+                continue
+            shifted = np.roll(grid,-1,axis = axis)
+            if not self._wraps(axis):
+                keep = [slice(None)]*len(self.shape)
+                keep[axis] = slice(None,-1)
+                pairs.append(np.column_stack((grid[tuple(keep)].ravel(),
+                                              shifted[tuple(keep)].ravel())))
+            else:
+                pairs.append(np.column_stack((grid.ravel(),shifted.ravel())))
+        if not pairs:
+            return np.zeros((0,2),dtype = np.int64)
+        pairs = np.sort(np.concatenate(pairs),axis = 1)
+        return pairs[np.lexsort((pairs[:,1],pairs[:,0]))]
+
+class SubAdjacency(Adjacency):
+    """The links among a subset of the rows of another adjacency. rows is a
+    slice of consecutive rows or an array of rows, and row i of the
+    subgraph is rows[i] of the parent. Nothing is copied from the parent."""
+
+    def __init__(self,parent,rows):
+        """Stores the parent adjacency and the rows of the subgraph."""
+        self.parent = parent
+        self.rows = rows
+        if isinstance(rows,slice):
+            self.size = len(range(*rows.indices(len(parent))))
+        else:
+            self.size = len(rows)
+        self._rank = None
+        self._csr = None
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the subgraph."""
+        return self.size
+
+    def __eq__(self,other):
+        """Two subgraphs are equal when they take the same rows of equal
+        adjacencies."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.parent == other.parent and \
+               np.array_equal(self.parentRows(),other.parentRows())
+
+    def parentRows(self):
+        """Returns an array with the parent row of every row."""
+        if isinstance(self.rows,slice):
+            return np.arange(len(self.parent))[self.rows]
+        return np.asarray(self.rows)
+
+    def rank(self):
+        """Returns an array with the subgraph row of every parent row, or -1
+        for the parent rows outside the subgraph."""
+        if self._rank is None:
+            self._rank = np.full(len(self.parent),-1,dtype = np.int64)
+            self._rank[self.rows] = np.arange(self.size)
+        return self._rank
+
+    def neighbors(self,row):
+        """Returns a sorted array with the neighbors of a row that are in
+        the subgraph."""
+        rank = self.rank()[self.parent.neighbors(self.parentRows()[row])]
+        return np.sort(rank[rank >= 0])
+
+    def degree(self,row):
+        """Returns the degree of one row inside the subgraph."""
+        return len(self.neighbors(row))
+
+    def degrees(self):
+        """Returns an array with the degree of every row inside the
+        subgraph."""
+        return self.neighborSums(np.ones(self.size,dtype = np.int64))
+
+    def edgeCount(self):
+        """Returns the number of undirected links."""
+        return len(self.edges())
+
+    def neighborSums(self,values):
+        """Returns the sum of the values of the neighbors of every row that
+        are in the subgraph. The values are placed in a zero array over the
+        parent rows, so rows outside the subgraph add nothing, and the
+        parent sums them with its own kernel."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        full = np.zeros(len(self.parent),dtype = values.dtype)
+        full[self.rows] = values
+        return self.parent.neighborSums(full)[self.rows]
+
+    def edges(self):
+        """Returns the (E,2) array of links inside the subgraph in sorted
+        order."""
+        edges = self.rank()[self.parent.edges()]
+        edges = edges[(edges >= 0).all(axis = 1)]
+        edges.sort(axis = 1)
+        return edges[np.lexsort((edges[:,1],edges[:,0]))]
@@ -16,18 +16,32 @@ __author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)',
 __all__ = ['CayleyTree']
 
 from Cayley.abstractnetwork import *
+from Cayley.adjacency import CSRAdjacency, TreeAdjacency
+from Cayley.views import NetworkView
+import numpy as np
 
 class CayleyTree(AbstractNetwork):
     """Creates the Cayley Tree object. The class needs integer values
        for number of generations and links."""
     
-    def __init__(self,generations,links,names = None): 
+    def __init__(self,generations,links,names = None,compact = False,
+                 implicit = False): 
         """Creates a Cayley Tree with desired number of generations and
-           links."""
+           links. A compact tree stores its links only as a frozen
+           CSRAdjacency instead of a neighbor set for every node. An
+           implicit tree stores nothing per node: its nodes are the ids
+           0 to nodeNumber()-1 and its links come from a TreeAdjacency."""
+        if implicit and names is not None:
+            raise ValueError("An implicit Cayley Tree cannot have names.")
         self.generations = generations #instance variables
         self.links = links
-        self.keys = list(range(self.nodeNumber()))
+        #generation offsets and index arithmetic, computed once
+        self._tree = TreeAdjacency(generations,links)
+        self.keys = range(self.nodeNumber()) if implicit else \
+                    list(range(self.nodeNumber()))
         self.__names = names
+        self.__compact = compact
+        self.__implicit = implicit
         AbstractNetwork.__init__(self)
         self.autoCreate()
         
@@ -58,28 +72,38 @@ class CayleyTree(AbstractNetwork):
         
     def nodeNumber(self):
         """Returns the total number of nodes in the Cayley tree. """
-        return sum(self.nodeGeneration())
+        return self._tree.size
 
     def nodeGeneration(self):
         """Returns a list with the number of nodes per generation in the Cayley
            Tree."""
-        list_of_nodes_by_generation = [1]
-        for x in range(1,self.generations+1):
-            nodes = (self.links * (self.links - 1)**(x - 1))
-            list_of_nodes_by_generation.append(nodes)
-        return list_of_nodes_by_generation
+        return np.diff(self._tree.offsets).tolist()
+
+    def generationOffsets(self):
+        """Returns a read-only array where generation g holds the nodes
+           offsets[g] to offsets[g+1]-1. It is computed once per tree."""
+        offsets = self._tree.offsets.view()
+        offsets.setflags(write = False)
+        return offsets
 
     def autoCreate(self):
         """Creates a dictionary with the node number as the key and with a list of
            its neighbors as the value. This method will be used in MonteCarlo
            class, since this dictionary will reduce the runtime of its simulate
            method."""
+        if self.__implicit:
+            self._implicitNodes(self._tree)
+            return
         try:
             for x in self.__names:
                 self.add(x)
         except TypeError:
             for x in range(self.nodeNumber()):
                 self.add(x)
+        if self.__compact:
+            self._freezeAdjacency(CSRAdjacency.fromEdges(self.linkArray(),
+                                                         self.nodeNumber()))
+            return
         self.multipleLinkCreator(self.nodes[0],{self.nodes[x] for x in
                                     range(1,self.nodeGeneration()[1]+1)})
         node_count = self.nodeGeneration()[1]
@@ -90,21 +114,123 @@ class CayleyTree(AbstractNetwork):
                                  range(1,self.links)})
                 node_count += self.links-1
         
+    def grow(self,generations = 1,names = None,**kwargs):
+        """Appends generations to the tree in place. The ids, names and
+        features of the existing nodes do not change, since the new nodes
+        take the ids after them. names gives the names of the new nodes,
+        their ids by default, and kwargs sets features of the new nodes,
+        such as state = 0.
+
+        An implicit tree only moves its generation offsets. An explicit tree
+        links each new node to its parent. A compact tree recompiles its
+        CSRAdjacency, which costs about as much as the new generation since
+        a generation holds most of the nodes of a tree."""
+        if self._permutation is not None:
+            raise AttributeError("Cannot grow a reordered Cayley Tree.")
+        old = self.nodeNumber()
+        self.generations += generations
+        self._tree = TreeAdjacency(self.generations,self.links)
+        new = range(old,self.nodeNumber())
+        if self.__implicit:
+            if names is not None:
+                raise ValueError("An implicit Cayley Tree cannot have names.")
+            self.keys = range(self.nodeNumber())
+            self._implicitNodes(self._tree)
+        else:
+            names = list(new) if names is None else list(names)
+            if len(names) != len(new) or \
+               any(name in self._index for name in names):
+                raise ValueError("Need a new name for every new node.")
+            if self._adjacency is None:
+                for name in names:
+                    self.add(name)
+                parents = self.parentFinder(np.arange(old,self.nodeNumber()))
+                for name,parent in zip(names,parents.tolist()):
+                    self.linkCreator(self.nodes[parent],name)
+            else: #the lists may be ranges or shared with other networks
+                self.nodes = list(self.nodes) + names
+                self.keys = list(self.keys) + names
+                self._index = {node: row for row,node in enumerate(self.nodes)}
+                self._nodeCount += 1
+                self.features.grow(len(self.nodes))
+                self._freezeAdjacency(CSRAdjacency.fromEdges(self.linkArray(),
+                                                             self.nodeNumber()))
+        for key,value in kwargs.items():
+            self.features.set(key,slice(old,None),value)
+
+    def linkArray(self):
+        """Returns an (E,2) array with the parent and child position of every
+        link, computed from the generation offsets without visiting nodes."""
+        return self._tree.edges()
+
+    def parentFinder(self,nodes):
+        """Takes a node or an array of nodes and returns the position of the
+        parent of each, where the center node has -1."""
+        return self._tree.parent(nodes)
+
+    def childFinder(self,node):
+        """Takes a node and returns a range with the positions of its
+        children."""
+        first = int(self._tree.firstChild(node))
+        return range(first,first+int(self._tree.childCount(node)))
+
+    def isImplicit(self):
+        """Returns True if the tree stores nothing per node."""
+        return self.__implicit
+
     def genFinder(self,node):
-        """Takes a node and returns the generation that the node is in."""
-        b = self.nodeGeneration()
-        count_gen = -1
-        for x in range(len(b)):
-            node = node - b[x]
-            count_gen += 1
-            if node < 0:
-                return count_gen
+        """Takes a node, or an array of nodes, and returns the generation that
+        each node is in with one searchsorted over the generation offsets."""
+        if np.ndim(node) == 0:
+            return int(self._tree.generation(node))
+        return self._tree.generation(node)
 
     def nodesPerGen(self,gen):
-        """Takes a generation and returns a list with the nodes in
+        """Takes a generation and returns a range with the nodes in
             the generation."""
-        b = self.nodeGeneration()
-        a = sum(b[0:gen])
-        c = self.nodeNumber()-sum(b[gen+1:self.generations+1])
-        return list(range(a,c))
+        return range(int(self._tree.offsets[gen]),int(self._tree.offsets[gen+1]))
+
+    def genReduce(self,values,how = 'sum'):
+        """Takes an array with one value per node, in node order, and returns
+        an array with one entry per generation. how is 'sum', 'mean' or
+        'count' (the number of nonzero values). Uses one np.add.reduceat
+        over the array instead of a Python loop per generation."""
+        values = self.originalOrder(values) #generations are id ranges
+        if how == 'count':
+            values = values != 0
+        if values.dtype.kind in 'biu': #small ints such as int8 states
+            values = values.astype(np.int64,copy = False)
+        sizes = np.diff(self._tree.offsets)
+        reduced = np.zeros(len(sizes),dtype = values.dtype)
+        filled = sizes > 0 #a generation can only be empty for 1 link trees
+        reduced[filled] = np.add.reduceat(values,self._tree.offsets[:-1][filled])
+        if how == 'mean':
+            return reduced/np.maximum(sizes,1)
+        elif how in ('sum','count'):
+            return reduced
+        raise ValueError("Reduction must be 'sum', 'mean' or 'count'.")
+
+    def generationView(self,gen):
+        """Returns a NetworkView of the nodes of a generation. It shares the
+        links and features of the tree."""
+        return NetworkView(self,self.currentIds(
+            slice(int(self._tree.offsets[gen]),int(self._tree.offsets[gen+1]))))
+
+    def subtreeView(self,node):
+        """Returns a NetworkView of a node and all of its descendants. The
+        descendants in each generation are consecutive ids, so the branch is
+        found one generation at a time, in the ids the tree had before any
+        reorder()."""
+        first = last = self.indexOf(node)
+        if self._permutation is not None:
+            first = last = int(self._permutation[first])
+        blocks = list()
+        while first <= last:
+            blocks.append(np.arange(first,last+1))
+            if self._tree.firstChild(first) < 0:
+                break
+            first,last = int(self._tree.firstChild(first)), \
+                         int(self._tree.firstChild(last) +
+                             self._tree.childCount(last) - 1)
+        return NetworkView(self,self.currentIds(np.concatenate(blocks)))
 
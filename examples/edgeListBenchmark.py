@@ -0,0 +1,46 @@
+"""
+Benchmark for reading a Graph from an edge list file.
+
+Writes a random gzipped TSV edge list, then times Graph.fromEdgeList on it
+and compares the throughput with building the same graph one add and
+linkCreator call at a time.
+"""
+
+import Cayley as cy
+import numpy as np
+import gzip
+import os
+import tempfile
+import time
+
+nodes = 10**5
+links = 10**6
+chunk = 10**5
+
+#Writing the edge list
+rng = np.random.default_rng(0)
+edges = rng.integers(0,nodes,(links,2)).tolist()
+path = os.path.join(tempfile.mkdtemp(),"edges.tsv.gz")
+with gzip.open(path,'wt') as handle:
+    handle.write("\n".join("%d\t%d" % (a,b) for a,b in edges))
+
+#Streaming loader
+start = time.time()
+graph = cy.Graph.fromEdgeList(path,delimiter = '\t',nodetype = int,
+                              chunkSize = chunk)
+stream = time.time() - start
+print("fromEdgeList: %d nodes, %d links in %.2f secs (%.0f lines/sec)" %
+      (len(graph),graph.adjacency().edgeCount(),stream,links/stream))
+
+#One call per node and link
+start = time.time()
+slow = cy.Graph()
+for a,b in edges:
+    slow.add(a)
+    slow.add(b)
+    slow.linkCreator(a,b)
+loop = time.time() - start
+print("add/linkCreator: %.2f secs (%.0f lines/sec)" % (loop,links/loop))
+print("Speedup: %.1fx" % (loop/stream))
+
+os.remove(path)
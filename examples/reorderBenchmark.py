@@ -0,0 +1,48 @@
+"""
+Benchmark for reordering the nodes of a Graph for cache locality.
+
+Builds a million node Graph whose ids are in random order (a 1000 by 1000
+grid read from a shuffled edge list), then times the neighbor sums of the
+whole network before and after reorder(). Neighbor sums are what the
+simulations compute every timestep.
+"""
+
+import Cayley as cy
+import numpy as np
+import os
+import tempfile
+import time
+
+side = 1000
+repeats = 20
+
+#Writing a grid with shuffled node names and links
+rng = np.random.default_rng(0)
+edges = cy.Lattice(side,side,implicit = True).linkArray()
+names = rng.permutation(side*side)
+edges = names[edges][rng.permutation(len(edges))]
+path = os.path.join(tempfile.mkdtemp(),"grid.txt")
+np.savetxt(path,edges,fmt = "%d")
+graph = cy.Graph.fromEdgeList(path,nodetype = int)
+os.remove(path)
+states = rng.integers(0,2,len(graph))
+
+def timeSums(network,states):
+    """Returns the average time of one neighbor sum over the network."""
+    adjacency = network.adjacency()
+    start = time.time()
+    for x in range(repeats):
+        adjacency.neighborSums(states)
+    return (time.time() - start)/repeats
+
+before = timeSums(graph,states)
+print("Insertion order: bandwidth %d, %.4f secs per sweep" %
+      (graph.compile().bandwidth(),before))
+
+start = time.time()
+order = graph.reorder('rcm')
+print("reorder('rcm') took %.2f secs" % (time.time() - start))
+after = timeSums(graph,states[order]) #the same states in the new id order
+print("RCM order: bandwidth %d, %.4f secs per sweep" %
+      (graph.compile().bandwidth(),after))
+print("Speedup: %.1fx" % (before/after))
@@ -0,0 +1,44 @@
+"""
+Benchmark for the vectorized simulateNN.
+
+Times simulateNN on a large implicit Cayley Tree and a million node periodic
+lattice, and compares the throughput with the old rule of parsing and
+evaluating the probability function and drawing one random.uniform per node,
+run on a sample of the tree.
+"""
+
+import Cayley as cy
+from Cayley.parser import Scanner, Translator, Evaluator
+import numpy as np
+import random
+import time
+
+steps = 10
+sample = 10**4
+
+def throughput(network):
+    """Returns the node updates per second of simulateNN on the network."""
+    monte = cy.MonteCarlo(network,seed = 0)
+    monte.emptyDictionary()
+    start = time.time()
+    for x in range(steps):
+        monte.simulateNN()
+    return len(network)*steps/(time.time() - start)
+
+tree = cy.CayleyTree(17,3,implicit = True)
+lattice = cy.HyperLattice((1000,1000),periodic = True)
+for name,network in (("CayleyTree(17,3)",tree),("1000x1000 lattice",lattice)):
+    print("%s: %d nodes, %.0f updates/sec" % (name,len(network),
+                                              throughput(network)))
+
+#The per node rule on the first nodes of the tree
+states = np.zeros(len(tree),dtype = np.int64)
+sums = tree.adjacency().neighborSums(states).tolist()
+start = time.time()
+for i in range(sample):
+    function = '0*0+(1-0)*0.5*(0.8^' + str(sums[i]) + ')' #variables plugged in
+    probability = Evaluator(Translator(Scanner(function)).translate()).evaluate()
+    random.uniform(0,1) <= probability
+loop = sample/(time.time() - start)
+print("Per node loop: %.0f updates/sec" % loop)
+print("Speedup: %.0fx" % (throughput(tree)/loop))
@@ -0,0 +1,98 @@
+"""
+Filename: factory.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the NetworkCache class and sharedNetwork. Parameter sweeps such as
+the ones in volume.py build the same network for every point of the sweep.
+The cache builds each distinct network once, keyed by its class and
+constructor arguments, freezes it, and afterwards hands out networks that
+share its read-only topology. Every network handed out has its own copy of
+the features, so the state of one run never leaks into another.
+"""
+
+__all__ = ['NetworkCache','sharedNetwork']
+
+from collections import OrderedDict
+import sys
+import numpy as np
+
+class NetworkCache(object):
+    """A least recently used cache of frozen networks. maxBytes bounds the
+    estimated memory of the cached topologies; the network used longest ago
+    is dropped first when a new one does not fit."""
+
+    def __init__(self,maxBytes = 2**30):
+        """Sets up an empty cache with the given memory bound."""
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._networks = OrderedDict() #key -> (network, estimated bytes)
+        self._bytes = 0
+
+    def __len__(self):
+        """Returns the number of cached networks."""
+        return len(self._networks)
+
+    def __contains__(self,key):
+        """Returns True if the network with the key is cached."""
+        return key in self._networks
+
+    def nbytes(self):
+        """Returns the estimated memory of the cached networks."""
+        return self._bytes
+
+    def get(self,cls,*args,**kwargs):
+        """Returns a network equal to cls(*args,**kwargs) that shares its
+        frozen topology with every other network asked for with the same
+        arguments. The first request builds it."""
+        key = self.key(cls,*args,**kwargs)
+        if key in self._networks:
+            self.hits += 1
+            self._networks.move_to_end(key)
+            return self._networks[key][0].share()
+        self.misses += 1
+        network = cls(*args,**kwargs)
+        network.freeze()
+        size = self._estimate(network)
+        self._networks[key] = (network,size)
+        self._bytes += size
+        while self._bytes > self.maxBytes and len(self._networks) > 1:
+            self._bytes -= self._networks.popitem(last = False)[1][1]
+        return network.share()
+
+    def key(self,cls,*args,**kwargs):
+        """Returns the hashable key of a class and its constructor arguments.
+        Lists, such as names, are keyed by their contents."""
+        return (cls,tuple(_hashable(x) for x in args),
+                tuple(sorted((k,_hashable(v)) for k,v in kwargs.items())))
+
+    def clear(self):
+        """Drops every cached network."""
+        self._networks.clear()
+        self._bytes = 0
+
+    def _estimate(self,network):
+        """Returns an estimate in bytes of the memory held by the topology
+        and node names of a network."""
+        size = sum(array.nbytes for array in vars(network.adjacency()).values()
+                   if isinstance(array,np.ndarray))
+        size += sys.getsizeof(network.nodes) + sys.getsizeof(network._index)
+        if not isinstance(network.nodes,range):
+            size += sum(sys.getsizeof(node) for node in network.nodes)
+        return size
+
+def _hashable(value):
+    """Turns lists and sets into tuples so they can be part of a key."""
+    if isinstance(value,(list,tuple)):
+        return tuple(_hashable(x) for x in value)
+    if isinstance(value,(set,frozenset)):
+        return frozenset(value)
+    return value
+
+cache = NetworkCache() #shared by the whole process
+
+def sharedNetwork(cls,*args,**kwargs):
+    """Returns cls(*args,**kwargs) from the process-wide NetworkCache. The
+    topology is built once per distinct set of arguments and is read-only;
+    the features belong to the network returned."""
+    return cache.get(cls,*args,**kwargs)
@@ -0,0 +1,323 @@
+"""
+Filename: features.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the FeatureStore and FeatureView classes. The store keeps every node
+feature (state, temperature, beta, ideology, ...) as one typed NumPy column
+indexed by the integer id of the node, instead of a dictionary per node. The
+view is what getNodeFeature hands out: it reads like the old dictionary of
+node to value, but it is backed by the column and costs nothing to create.
+A FeatureSubset is the store of a network view: the features of a subset of
+the rows of another store, read and written in place.
+"""
+
+__all__ = ['FeatureStore','FeatureSubset','FeatureView']
+
+from collections.abc import MutableMapping
+import numpy as np
+
+class FeatureStore(object):
+    """Holds node features as NumPy columns. Row i of every column belongs to
+    the node with id i. A feature that was never given to a node is marked
+    as absent for that row. version counts the changes made through the
+    store, so results computed from the features can tell they are stale."""
+
+    def __init__(self):
+        """Sets up an empty store."""
+        self._columns = dict()
+        self._present = dict()
+        self._size = 0
+        self._capacity = 0
+        self.version = 0
+
+    def __len__(self):
+        """Returns the number of rows (nodes) in the store."""
+        return self._size
+
+    def __contains__(self,name):
+        """Returns True if the feature exists in the store."""
+        return name in self._columns
+
+    def names(self):
+        """Returns a list with the names of the features."""
+        return list(self._columns)
+
+    def grow(self,size):
+        """Makes room for rows up to size. New rows have no features. The
+        columns double their capacity, so adding nodes one at a time costs
+        amortized constant time."""
+        if size > self._capacity:
+            capacity = max(size,2*self._capacity,16)
+            for name in self._columns:
+                self._columns[name] = self._resize(self._columns[name],capacity)
+                self._present[name] = self._resize(self._present[name],capacity)
+            self._capacity = capacity
+        if size > self._size:
+            self._size = size
+            self.version += 1
+
+    def define(self,name,dtype,fill = None):
+        """Creates a feature column with the given dtype. If fill is given,
+        every node gets that value, otherwise every node lacks the feature.
+        An existing column is cast to the new dtype."""
+        dtype = np.dtype(dtype)
+        if name in self._columns:
+            self._columns[name] = self._columns[name].astype(dtype)
+        else:
+            self._columns[name] = np.zeros(self._capacity,dtype = dtype)
+            self._present[name] = np.zeros(self._capacity,dtype = bool)
+        if fill is not None:
+            self._columns[name][:self._size] = fill
+            self._present[name][:self._size] = True
+        self.version += 1
+
+    def set(self,name,rows,values,dtype = None):
+        """Sets the feature of the given rows. rows can be an integer, a
+        slice, or an array of ids and values a scalar or an array that
+        broadcasts against them. The column is created or promoted to a
+        wider dtype when the values do not fit in it. A tuple, list or other
+        object given to a single row, or any value given to a row of an object
+        column, is stored as it is."""
+        if isinstance(rows,(int,np.integer)) and dtype is None and \
+           not isinstance(values,np.ndarray) and (not np.isscalar(values) or
+           name in self._columns and self._columns[name].dtype == object):
+            if name not in self._columns:
+                self.define(name,object)
+            elif self._columns[name].dtype != object:
+                self._columns[name] = self._columns[name].astype(object)
+            self._columns[name][:self._size][rows] = values
+            self._present[name][:self._size][rows] = True
+            self.version += 1
+            return
+        values = np.asarray(values,dtype = dtype)
+        if values.dtype.kind in 'US':
+            values = values.astype(object)
+        if name not in self._columns:
+            self.define(name,values.dtype)
+        elif dtype is not None and values.dtype != self._columns[name].dtype:
+            self.define(name,values.dtype)
+        else:
+            wider = self._promote(self._columns[name].dtype,values.dtype)
+            if wider != self._columns[name].dtype:
+                self._columns[name] = self._columns[name].astype(wider)
+        self._columns[name][:self._size][rows] = \
+                            values[()] if values.ndim == 0 else values
+        self._present[name][:self._size][rows] = True
+        self.version += 1
+
+    def attach(self,name,column,present):
+        """Makes the arrays given the column and presence mask of a feature
+        without copying them, so they can be memory maps. Every column must
+        have one row per node."""
+        if not self._columns and self._size == 0:
+            self._size = self._capacity = len(column)
+        if len(column) != self._size or len(present) != self._size:
+            raise ValueError("Column does not match the number of nodes.")
+        if len(column) != self._capacity:
+            column = self._resize(column,self._capacity)
+            present = self._resize(present,self._capacity)
+        self._columns[name] = column
+        self._present[name] = present
+        self.version += 1
+
+    def get(self,name,rows):
+        """Returns the feature of the given rows."""
+        return self.column(name)[rows]
+
+    def column(self,name):
+        """Returns a zero-copy view of the column of a feature. Writing to the
+        view writes to the store but does not change its version."""
+        return self._columns[name][:self._size]
+
+    def present(self,name):
+        """Returns a zero-copy boolean view of which rows have the feature."""
+        return self._present[name][:self._size]
+
+    def discard(self,name,row):
+        """Marks a row as not having a feature."""
+        self._present[name][row] = False
+        self.version += 1
+
+    def permute(self,order):
+        """Reorders the rows of every column, so that row i gets the values
+        of row order[i]."""
+        for name in self._columns:
+            self._columns[name][:self._size] = self._columns[name][order]
+            self._present[name][:self._size] = self._present[name][order]
+        self.version += 1
+
+    def remove(self,row):
+        """Removes a row, shifting the rows after it down by one."""
+        for name in self._columns:
+            self._columns[name] = np.delete(self._columns[name],row)
+            self._present[name] = np.delete(self._present[name],row)
+        self._size -= 1
+        self._capacity -= 1
+        self.version += 1
+
+    def copy(self):
+        """Returns a store with its own copy of every column."""
+        store = FeatureStore()
+        store._columns = {name: column.copy() for name,column in
+                          self._columns.items()}
+        store._present = {name: present.copy() for name,present in
+                          self._present.items()}
+        store._size = self._size
+        store._capacity = self._capacity
+        return store
+
+    def clear(self):
+        """Removes all rows and features."""
+        version = self.version
+        self.__init__()
+        self.version = version+1
+
+    def _resize(self,column,capacity):
+        """Returns a copy of the column with a new capacity."""
+        resized = np.zeros(capacity,dtype = column.dtype)
+        resized[:len(column)] = column
+        return resized
+
+    def _promote(self,current,new):
+        """Returns a dtype that can hold values of both dtypes."""
+        if current == object or new == object:
+            return np.dtype(object)
+        try:
+            wider = np.result_type(current,new)
+        except TypeError:
+            return np.dtype(object)
+        if wider.kind in 'USV':
+            return np.dtype(object)
+        return wider
+
+class FeatureSubset(object):
+    """The features of a subset of the rows of a FeatureStore. rows is a
+    slice of consecutive rows or an array of rows, and row i of the subset
+    is rows[i] of the store. With a slice, columns are zero-copy views of
+    the store; with an array they are gathered copies. Writes always go to
+    the store."""
+
+    def __init__(self,store,rows,size):
+        """Sets the store, the rows and the number of rows."""
+        self.store = store
+        self.rows = rows
+        self._size = size
+
+    def __len__(self):
+        """Returns the number of rows in the subset."""
+        return self._size
+
+    def __contains__(self,name):
+        """Returns True if the feature exists in the store."""
+        return name in self.store
+
+    @property
+    def version(self):
+        """The version of the store."""
+        return self.store.version
+
+    def names(self):
+        """Returns a list with the names of the features."""
+        return self.store.names()
+
+    def grow(self,size):
+        """A subset cannot grow."""
+        if size > self._size:
+            raise AttributeError("Cannot add rows to a subset of a store.")
+
+    def define(self,name,dtype,fill = None):
+        """Creates the feature in the store, or casts it, and fills the rows
+        of the subset if fill is given."""
+        self.store.define(name,dtype)
+        if fill is not None:
+            self.store.set(name,self.rows,fill)
+
+    def set(self,name,rows,values,dtype = None):
+        """Sets the feature of the given rows of the subset."""
+        self.store.set(name,self._storeRows(rows),values,dtype)
+
+    def get(self,name,rows):
+        """Returns the feature of the given rows."""
+        return self.column(name)[rows]
+
+    def column(self,name):
+        """Returns the column of a feature over the rows of the subset."""
+        return self.store.column(name)[self.rows]
+
+    def present(self,name):
+        """Returns which rows of the subset have the feature."""
+        return self.store.present(name)[self.rows]
+
+    def discard(self,name,row):
+        """Marks a row as not having a feature."""
+        self.store.discard(name,self._storeRows(row))
+
+    def copy(self):
+        """Returns a FeatureStore with a copy of the rows of the subset."""
+        store = FeatureStore()
+        store.grow(self._size)
+        for name in self.names():
+            store.define(name,self.store.column(name).dtype)
+            store.column(name)[:] = self.column(name)
+            store.present(name)[:] = self.present(name)
+        return store
+
+    def _storeRows(self,rows):
+        """Returns the rows of the store for rows of the subset."""
+        if isinstance(rows,slice) and rows == slice(None):
+            return self.rows
+        if isinstance(self.rows,slice):
+            return np.arange(self.rows.start,self.rows.stop)[rows]
+        return np.asarray(self.rows)[rows]
+
+class FeatureView(MutableMapping):
+    """A dictionary-like view of one feature of a network, keyed by node
+    name. Reading and writing go straight to the column in the store."""
+
+    def __init__(self,network,name):
+        """Creates the view of the feature with the name given."""
+        self._network = network
+        self._name = name
+
+    def __getitem__(self,node):
+        """Returns the value of the feature for a node."""
+        store = self._network.features
+        row = self._network._index[node]
+        if not store.present(self._name)[row]:
+            raise KeyError(node)
+        value = store.column(self._name)[row]
+        return value.item() if isinstance(value,np.generic) else value
+
+    def __setitem__(self,node,value):
+        """Sets the value of the feature for a node."""
+        self._network.features.set(self._name,self._network._index[node],value)
+
+    def __delitem__(self,node):
+        """Marks a node as not having the feature."""
+        self._network.features.discard(self._name,self._network._index[node])
+
+    def __iter__(self):
+        """Iterates over the nodes that have the feature."""
+        present = self._network.features.present(self._name)
+        return (self._network.nodes[row] for row in np.flatnonzero(present))
+
+    def __len__(self):
+        """Returns the number of nodes that have the feature."""
+        return int(np.count_nonzero(self._network.features.present(self._name)))
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def column(self):
+        """Returns a zero-copy array of the feature, indexed by node id."""
+        return self._network.features.column(self._name)
+
+    def copy(self):
+        """Returns a plain dictionary snapshot of the feature."""
+        column = self.column()
+        present = self._network.features.present(self._name)
+        values = column.tolist()
+        if present.all():
+            return dict(zip(self._network.nodes,values))
+        return {self._network.nodes[row]: values[row]
+                for row in np.flatnonzero(present)}
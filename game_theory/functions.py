@@ -431,9 +431,9 @@ def random_agent(network,agent1):
     >>> cgt.senate(g)
     >>> cgt.random_agent(g,"Cruz")
     """
-    agent2 = random.choice(list(network))#chooses random senator
-    if agent1 == agent2:
-        random_agent(network,agent1)
+    agent2 = network.nameOf(random.randrange(len(network)))#chooses random senator
+    while agent1 == agent2 and len(network) > 1:
+        agent2 = network.nameOf(random.randrange(len(network)))
     return agent2
 
 def timestep(network,issue_rating,a,b,c,d,k):
@@ -477,10 +477,14 @@ def timestep(network,issue_rating,a,b,c,d,k):
     >>> cgt.randomStart(g)
     >>> cgt.timestep(g,0.4,1,5.23,100,0.3,20.2)
     """
-    strategy_d = network.getNodeFeature('strategy').copy()
-    ideology_d = network.getNodeFeature('ideology').copy()
-    for node in network:
-        ideology_agent1 = float(ideology_d[node])
+    nodes = network.getNodes()
+    strategy_d = network.getNodeFeature('strategy')
+    ideology_d = network.getNodeFeature('ideology')
+    #strategies and ideologies are held by integer id for the whole timestep
+    strategies = [strategy_d[node] for node in nodes]
+    ideologies = [float(ideology_d[node]) for node in nodes]
+    for i,node in enumerate(nodes):
+        ideology_agent1 = ideologies[i]
         agent2 = random_agent(network,node)
         if issue_rating < 0.5 and ideology_agent1 < 0.5:
             matrix = payoff_matrix1(network,a,b,c,d,node,agent2)
@@ -488,17 +492,17 @@ def timestep(network,issue_rating,a,b,c,d,k):
             matrix = payoff_matrix2(network,a,b,c,d,node,agent2)
         elif issue_rating > 0.5 and ideology_agent1 < 0.5:
             matrix = payoff_matrix3(network,a,b,c,d,node,agent2)
-        elif issue_rating > 0.5 and ideology_agent > 0.5:
-            marix = payoff_matrix4(network,a,b,c,d,node,agent2)
+        elif issue_rating > 0.5 and ideology_agent1 > 0.5:
+            matrix = payoff_matrix4(network,a,b,c,d,node,agent2)
         game(network,matrix,node,agent2)
-        imagined_d = network.getNodeFeature('imagined_reward').copy()
-        real_d = network.getNodeFeature('real_reward').copy()
-        if imagined_d[node] > real_d[node]:
-            network.add(node,strategy = 1-strategy_d[node])
+        imagined_reward = network.getNodeFeature('imagined_reward')[node]
+        real_reward = network.getNodeFeature('real_reward')[node]
+        if imagined_reward > real_reward:
+            network.add(node,strategy = 1-strategies[i])
         else:
-            switch_probability = math.e**(-1*(real_d[node]-imagined_d[node])/k)
+            switch_probability = math.e**(-1*(real_reward-imagined_reward)/k)
             if random.uniform(0,1) <= switch_probability:
-                network.add(node,strategy = 1-strategy_d[node])
+                network.add(node,strategy = 1-strategies[i])
 
 def data_export(name,network):
     """
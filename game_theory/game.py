@@ -29,12 +29,12 @@ def main():
     g = cy.Graph()
     cgt.senate(g)
     cgt.random_strat_start(g)
-    strategy_data_dump.append(g.getNodeFeature('strategy'))
+    strategy_data_dump.append(g.getNodeFeature('strategy').copy())
     for step in range(timesteps):
         cgt.timestep(g,issue_rating,a,b,c,d,k)
-        strategy_data_dump.append(g.getNodeFeature('strategy'))
-        real_data_dump.append(g.getNodeFeature('real_reward'))
-        imagined_data_dump.append(g.getNodeFeature('imagined_reward'))
+        strategy_data_dump.append(g.getNodeFeature('strategy').copy())
+        real_data_dump.append(g.getNodeFeature('real_reward').copy())
+        imagined_data_dump.append(g.getNodeFeature('imagined_reward').copy())
     cgt.export_data(name_of_excel_sheet,g,strategy_data_dump,real_data_dump,
                                     imagined_data_dump)
     
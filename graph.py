@@ -3,7 +3,8 @@ Authors: Justin Pusztay
 Filename: graph.py
 Project: Research for Irina Mazilu, Ph.D.
 
-This file contains the graph class. Allows users to build their own graph.
+This file contains the graph class. Allows users to build their own graph,
+node by node or from an edge list file.
 """
 
 __author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)'])
@@ -11,6 +12,11 @@ __author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)'])
 __all__ = ['Graph']
 
 from Cayley.abstractnetwork import *
+from Cayley.adjacency import CSRAdjacency
+from itertools import islice
+import gzip
+import warnings
+import numpy as np
 
 class Graph(AbstractNetwork):
 
@@ -20,18 +26,77 @@ class Graph(AbstractNetwork):
         AbstractNetwork.__init__(self)
          
     def __eq__(self,other):
-        """Need to look at Lambert's."""
+        """Two graphs are equal when they have the same nodes and the same
+        links, in whatever order the nodes were added or reorder() left
+        them, which is checked by their fingerprints."""
         if self is other:
             return True
         if type(self) != type(other):
             return False
+        return self.fingerprint(False) == other.fingerprint(False)
 
     def nodeNumber(self):
         """Returns the total number of nodes in the Lattice."""
-        return len(self.graph)
+        return len(self.nodes)
 
     def getType(self):
         """Quick fix for MonteCarlo."""
         return "Graph"
 
-       
+    @classmethod
+    def fromEdgeList(cls,path,delimiter = None,nodetype = str,
+                     chunkSize = 1000000,comments = '#'):
+        """Reads a graph from an edge list file with one link per line, the
+        two nodes in the first two columns and any other columns ignored.
+        Lines starting with comments and blank lines are skipped.
+        delimiter is ',' for CSV, '\\t' for TSV and None for any whitespace.
+        Files ending in .gz are decompressed on the fly. nodetype converts
+        the node names, str by default.
+
+        The file is read chunkSize lines at a time and each chunk is parsed
+        by np.loadtxt. The distinct names of a chunk are interned to dense
+        ids and the chunk is kept only as an int32 array of ids, so apart
+        from the link arrays and the names themselves the memory used is
+        bounded by the chunk size. The links end up in a frozen
+        CSRAdjacency; repeated links are kept once and self-links are
+        dropped."""
+        opener = gzip.open if str(path).endswith('.gz') else open
+        index = dict()
+        chunks = list()
+        with opener(path,'rt') as handle:
+            while True:
+                lines = list(islice(handle,chunkSize))
+                if not lines:
+                    break
+                with warnings.catch_warnings(): #a chunk may be all comments
+                    warnings.simplefilter('ignore',UserWarning)
+                    pairs = np.loadtxt(lines,dtype = nodetype,
+                                       delimiter = delimiter,usecols = (0,1),
+                                       comments = comments,ndmin = 2)
+                if not len(pairs):
+                    continue
+                if pairs.dtype.kind == 'U': #names like ' b' in 'a, b'
+                    pairs = np.char.strip(pairs)
+                unique,inverse = np.unique(pairs,return_inverse = True)
+                intern = index.setdefault #a new node gets the next id
+                ids = np.array([intern(node,len(index)) for node in
+                                unique.tolist()],dtype = np.int32)
+                chunks.append(ids[inverse.reshape(-1,2)])
+        names = list(index)
+        edges = np.concatenate(chunks) if chunks else \
+                np.zeros((0,2),dtype = np.int32)
+        edges = edges[edges[:,0] != edges[:,1]]
+        edges.sort(axis = 1)
+        size = max(len(names),1)
+        keys = np.sort(edges[:,0].astype(np.int64)*size + edges[:,1])
+        keys = keys[np.diff(keys,prepend = -1) != 0] #repeated links once
+        edges = np.column_stack((keys//size,keys%size))
+        graph = cls()
+        graph.nodes = names
+        graph.keys = list(names)
+        graph._index = index
+        graph._nodeCount += 1
+        graph.features.grow(len(names))
+        graph._freezeAdjacency(CSRAdjacency.fromEdges(edges,len(names)))
+        return graph
+
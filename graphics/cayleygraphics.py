@@ -45,8 +45,8 @@ class CayleyGraphics(object):
         #graph =nx.balanced_tree(connections,generations)
 
         # add edges
-        for edge in self.tree.linksAsTuples():
-            graph.add_edge(edge[0], edge[1])
+        edges = self.tree.edgeArray().tolist()
+        graph.add_edges_from(edges)
 
         # these are different layouts for the network you may try
         # shell seems to work best
@@ -76,9 +76,9 @@ class CayleyGraphics(object):
                                 font_family=text_font)
 
         if labels is None:
-            labels = range(len(self.tree.linksAsTuples()))
+            labels = range(len(edges))
 
-        edge_labels = dict(zip(self.tree.linksAsTuples(), labels))
+        edge_labels = dict(zip(map(tuple,edges), labels))
         """
         #Below on how to label edges.
         nx.draw_networkx_edge_labels(graph, graph_pos, edge_labels=edge_labels, 
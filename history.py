@@ -0,0 +1,138 @@
+"""
+Filename: history.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the History and StateView classes. A MonteCarlo simulation used to
+keep a dictionary of node to state for every timestep. The History keeps the
+states instead as one (timesteps, nodes) int8 array, where row t holds the
+state of every node id at timestep t, and grows it by doubling. A StateView
+is what simData hands out: it reads like the old dictionary of node to state
+but is backed by one row of the array.
+"""
+
+__all__ = ['History','StateView']
+
+from collections.abc import Mapping
+import numpy as np
+
+class History(object):
+    """The states of the nodes of a network at every timestep of a
+    simulation. A row is never changed once it is appended, so the rows and
+    views handed out stay valid while the simulation goes on."""
+
+    def __init__(self,network,capacity = 16):
+        """Sets up an empty history for the nodes of the network, with room
+        for capacity timesteps before the array has to grow."""
+        self._network = network
+        self._capacity = max(int(capacity),1)
+        self._states = None #allocated by the first append
+        self._steps = 0
+
+    def __len__(self):
+        """Returns the number of timesteps."""
+        return self._steps
+
+    def __getitem__(self,timestep):
+        """Returns a StateView of a timestep."""
+        return StateView(self._network,self.row(timestep))
+
+    def __iter__(self):
+        """Iterates over the StateViews of the timesteps."""
+        return (self[t] for t in range(self._steps))
+
+    def __repr__(self):
+        return "History(%d timesteps, %d nodes)" % (self._steps,self.width())
+
+    def width(self):
+        """Returns the number of nodes in a row."""
+        return 0 if self._states is None else self._states.shape[1]
+
+    def row(self,timestep):
+        """Returns a read-only array with the state of every node id at a
+        timestep. Negative timesteps count from the end."""
+        if not -self._steps <= timestep < self._steps:
+            raise IndexError("No timestep " + str(timestep) + ".")
+        row = self._states[timestep % self._steps].view()
+        row.setflags(write = False)
+        return row
+
+    def array(self):
+        """Returns a read-only (timesteps, nodes) array of every state."""
+        if self._states is None:
+            return np.zeros((0,len(self._network)),dtype = np.int8)
+        states = self._states[:self._steps].view()
+        states.setflags(write = False)
+        return states
+
+    def append(self,states):
+        """Appends the states of every node id, as an array or a list, as
+        the next timestep. The array doubles when it is full, so appending
+        costs $O(n)$ amortized."""
+        states = np.asarray(states)
+        if self._states is None:
+            self._states = np.zeros((self._capacity,len(states)),dtype = np.int8)
+        elif self._steps == len(self._states):
+            self.reserve(2*self._steps)
+        self._states[self._steps] = states
+        self._steps += 1
+
+    def reserve(self,timesteps):
+        """Makes room for the given number of timesteps in total, so a run of
+        known length never copies the array."""
+        if self._states is None:
+            self._capacity = max(self._capacity,int(timesteps))
+        elif timesteps > len(self._states):
+            states = np.zeros((timesteps,self._states.shape[1]),dtype = np.int8)
+            states[:self._steps] = self._states[:self._steps]
+            self._states = states
+
+    def resize(self,size,fill = 0):
+        """Gives every timestep room for size nodes. New nodes get the fill
+        state at every timestep. The array is copied, so views handed out
+        before keep their old rows."""
+        if self._states is None or size == self._states.shape[1]:
+            return
+        states = np.full((len(self._states),size),fill,dtype = np.int8)
+        width = min(size,self._states.shape[1])
+        states[:,:width] = self._states[:,:width]
+        self._states = states
+
+class StateView(Mapping):
+    """A read-only dictionary-like view of one timestep, keyed by node name.
+    It reads like the dictionaries simData used to return."""
+
+    def __init__(self,network,row):
+        """Creates the view of a row of states of the network."""
+        self._network = network
+        self._row = row
+
+    def __getitem__(self,node):
+        """Returns the state of a node."""
+        return int(self._row[self._network._index[node]])
+
+    def __iter__(self):
+        """Iterates over the nodes."""
+        return iter(self._network.nodes[:len(self._row)])
+
+    def __len__(self):
+        """Returns the number of nodes."""
+        return len(self._row)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def network(self):
+        """Returns the network whose node ids index the row."""
+        return self._network
+
+    def array(self):
+        """Returns the read-only row of states, indexed by node id."""
+        return self._row
+
+    def values(self):
+        """Returns a list with the state of every node, in id order."""
+        return self._row.tolist()
+
+    def copy(self):
+        """Returns a plain dictionary snapshot of the states."""
+        return dict(zip(self._network.nodes,self._row.tolist()))
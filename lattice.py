@@ -7,28 +7,50 @@ This file contains the Lattice class. This class creates a Cayley Tree
 object, by setting up the nodes and links between nodes. It also has methods
 which allow for some basic analysis of the object such as number of nodes and
 nodes per floor. 	
+
+It also contains the HyperLattice class, a hypercubic lattice with any number
+of dimensions given by a shape tuple, which stores nothing per node.
 """
 
 __author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)'])
 
-__all__ = ['Lattice']
+__all__ = ['Lattice','HyperLattice']
 
 from Cayley.abstractnetwork import *
+from Cayley.adjacency import CSRAdjacency, StencilAdjacency
+from Cayley.views import NetworkView
+import numpy as np
 
 class Lattice(AbstractNetwork):
     """Creates the Lattice object. The class needs integer values for the
     length, width, and height based on the number of nodes. It defaults to a
     2-demensional lattice."""
 
-    def __init__(self,length,width,height = 1,names = None):
-        """Sets up the demenstions of the lattice."""
+    def __init__(self,length,width,height = 1,names = None,compact = False,
+                 periodic = False,implicit = False):
+        """Sets up the demenstions of the lattice. A compact lattice stores
+        its links only as a frozen CSRAdjacency. periodic is a bool, or a
+        tuple of bools for the length, width and height axes, that links the
+        last node of the axis to the first. An implicit lattice stores no
+        links at all: its nodes are the ids 0 to nodeNumber()-1 and its
+        neighbors come from a StencilAdjacency over the grid."""
+        if implicit and names is not None:
+            raise ValueError("An implicit Lattice cannot have names.")
         AbstractNetwork.__init__(self)
         self.x = length
         self.y = width
         self.z = height-1
         self.__names = names
+        self.__compact = compact
+        self.__implicit = implicit
         self.latticeProtect()
-        self.keys = list(range(self.nodeNumber()))
+        if not isinstance(periodic,(tuple,list)):
+            periodic = (periodic,)*3
+        self.periodic = tuple(bool(p) for p in periodic)
+        #the grid is numbered floor by floor, so the axes are (z, y, x)
+        self._stencil = StencilAdjacency(self.shape(),self.periodic[::-1])
+        self.keys = range(self.nodeNumber()) if implicit else \
+                    list(range(self.nodeNumber()))
         self.autoCreate()
         
     def __eq__(self,other):
@@ -38,7 +60,7 @@ class Lattice(AbstractNetwork):
         if type(self) != type(other):
             return False
         elif self.x == other.x and self.y == other.y and \
-             self.z == other.z:
+             self.z == other.z and self.periodic == other.periodic:
             return True
         else:
             return False
@@ -64,40 +86,143 @@ class Lattice(AbstractNetwork):
         """Returns the number of nodes in a cross section of the z-plane."""
         return self.x*self.y
 
+    def shape(self):
+        """Returns the (floors, width, length) shape of the grid of nodes,
+        where node ids run along the length first."""
+        return (self.z+1,self.y,self.x)
+
+    def floorView(self,floor):
+        """Returns a NetworkView of the nodes of one floor (z-plane). It
+        shares the links and features of the lattice."""
+        return NetworkView(self,self.currentIds(
+            slice(floor*self.floorArea(),(floor+1)*self.floorArea())))
+
+    def isImplicit(self):
+        """Returns True if the lattice stores no links."""
+        return self.__implicit
+
     def autoCreate(self):
         """Creates the links present in a lattice. If the object was created
         with a given set of names that go in the order that the lattice is
         numberd, then the nodes will be properly linked as intended.
 
         If no names are given, it just uses a number as a name."""
+        if self.__implicit:
+            self._implicitNodes(self._stencil)
+            return
         try:
             for x in self.__names:
                 self.add(x)
         except TypeError:
             for x in range(self.nodeNumber()):
                 self.add(x)
-        row_count = 0
-        floor_count = 0
-        node_count = 0
-        for node in self:
-            column_count = node_count % self.x
-            if column_count % self.x != self.x -1: #checks if at x-max
-                self.linkCreator(node,self.nodes[node_count+1])
-            if column_count % self.x != 0: #checks if at x-min
-               self.linkCreator(node,self.nodes[node_count-1])
-               
-            if row_count % self.y != self.y-1: #checks if at y-max
-                self.linkCreator(node,self.nodes[node_count+self.x])
-            if row_count % self.y != 0: #checks if at y-min
-                self.linkCreator(node,self.nodes[node_count-self.x])
-            if node_count % self.x == self.x - 1:
-                row_count += 1
-    
-            if floor_count != self.z: #checks if at z-max
-                self.linkCreator(node,self.nodes[node_count+self.floorArea()])
-            if floor_count != 0: #checks if at z-min
-                self.linkCreator(node,self.nodes[node_count-self.floorArea()])
-            if node_count % self.floorArea() == self.floorArea() - 1:
-                floor_count += 1
-            node_count += 1
- 
+        if self.__compact:
+            self._freezeAdjacency(CSRAdjacency.fromEdges(self.linkArray(),
+                                                         self.nodeNumber()))
+            return
+        for i,j in self.linkArray().tolist():
+            self.linkCreator(self.nodes[i],self.nodes[j])
+
+    def linkArray(self):
+        """Returns an (E,2) array with the positions of the two nodes of every
+        link, found by pairing neighboring cells of the grid along each axis
+        and wrapping around the periodic ones."""
+        return self._stencil.edges()
+
+    def neighborGrid(self,values):
+        """Takes an array with one value per node, flat or shaped like the
+        grid, and returns the sum of the neighbors of every node in the same
+        shape, by shifting the grid along each axis."""
+        return self._stencil.neighborSums(values)
+
+class HyperLattice(AbstractNetwork):
+    """A hypercubic lattice with the dimensions given by a shape tuple, such
+    as (10,10,10,10) for a 4 dimensional lattice. Like an implicit Lattice its
+    nodes are the ids 0 to nodeNumber()-1, numbered in C order so the last
+    axis changes fastest, and its links come from a StencilAdjacency. States
+    live in feature columns that can be viewed as grids of the same shape."""
+
+    def __init__(self,shape,periodic = False):
+        """Sets up the shape of the lattice. periodic is a bool, or a tuple
+        with one bool per axis, that links the last node of the axis to the
+        first."""
+        shape = tuple(int(n) for n in shape)
+        if not shape or min(shape) < 1:
+            raise ValueError("Inappropriate entries lattice cannot exist")
+        AbstractNetwork.__init__(self)
+        self._stencil = StencilAdjacency(shape,periodic)
+        self.periodic = self._stencil.periodic
+        self.keys = range(self.nodeNumber())
+        self.autoCreate()
+
+    def __eq__(self,other):
+        """Two hyperlattices are equal when they have the same shape and
+        boundaries."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self._stencil == other._stencil
+
+    def getType(self):
+        """Quick fix for MonteCarlo"""
+        return "HyperLattice"
+
+    def nodeNumber(self):
+        """Returns the total number of nodes in the lattice."""
+        return self._stencil.size
+
+    def shape(self):
+        """Returns the shape of the grid of nodes."""
+        return self._stencil.shape
+
+    def dimension(self):
+        """Returns the number of axes of the lattice."""
+        return len(self._stencil.shape)
+
+    def autoCreate(self):
+        """Makes the nodes the ids of the cells and the StencilAdjacency the
+        backing store of the links."""
+        self._implicitNodes(self._stencil)
+
+    def linkArray(self):
+        """Returns an (E,2) array with the positions of the two nodes of every
+        link."""
+        return self._stencil.edges()
+
+    def cell(self,node):
+        """Takes a node, or an array of nodes, and returns its coordinates."""
+        return np.unravel_index(node,self.shape())
+
+    def nodeAt(self,cell):
+        """Takes the coordinates of a cell and returns its node."""
+        return int(np.ravel_multi_index(tuple(cell),self.shape()))
+
+    def grid(self,name = 'state'):
+        """Returns a zero-copy view of a feature column shaped like the
+        lattice. Writing to the grid sets the feature."""
+        return self.getFeatureArray(name).reshape(self.shape())
+
+    def neighborGrid(self,values):
+        """Takes an array with one value per node, flat or shaped like the
+        grid, and returns the sum of the neighbors of every node in the same
+        shape."""
+        return self._stencil.neighborSums(values)
+
+    def axisSums(self,values,axis):
+        """Takes an array with one value per node, flat or shaped like the
+        grid, and returns the sum of the two neighbors of every node along
+        one axis in the same shape."""
+        return self._stencil.axisSums(values,axis)
+
+    def sliceView(self,axis,position):
+        """Returns a NetworkView of the nodes at one position along an axis,
+        such as a 3 dimensional slice of a 4 dimensional lattice. It shares
+        the links and features of the lattice."""
+        ids = np.arange(self.nodeNumber()).reshape(self.shape())
+        if axis == 0: #a block of consecutive ids
+            block = ids[position]
+            return NetworkView(self,self.currentIds(
+                slice(int(block.flat[0]),int(block.flat[-1])+1)))
+        return NetworkView(self,self.currentIds(
+            np.take(ids,position,axis = axis).ravel()))
@@ -16,23 +16,30 @@ import random
 import xlsxwriter #http://xlsxwriter.readthedocs.io/tutorial01.html
 from Cayley.cayleytree import *
 from Cayley.lattice import *
+from Cayley.history import History, StateView
 import numpy as np
-from Cayley.parser import evaluator
+from Cayley.parser import compileFunction
 
 class MonteCarlo(object):
 
     def __init__(self, network,
                  alpha = .5, beta = .8, gamma = 0.0, mu = 0.3,
-                 r1 = 0.3, r2 = 0.5):
-        """Runs the Monte Carlo simulation the desired number of times."""
+                 r1 = 0.3, r2 = 0.5, seed = None):
+        """Runs the Monte Carlo simulation the desired number of times. seed
+        is anything np.random.default_rng takes and seeds the random numbers
+        of the vectorized simulations."""
         self.__network = network
-        self.__sim_data = list()
+        self.__sim_data = History(network) #one int8 row per timestep
+        self.__total = None
+        self.__densities = None
+        self.__tables = dict() #name -> (key, constants, classes, lowest sum, table)
         self.alpha = alpha
         self.beta = beta
         self.gamma = gamma
         self.mu = mu
         self.r1 = r1
         self.r2 = r2
+        self.rng = np.random.default_rng(seed)
 
     def getAlpha(self):
         """Returns alpha value."""
@@ -94,8 +101,8 @@ class MonteCarlo(object):
         {0:0,1:0,2:0,3:0}
         """
         if len(self.__sim_data) == 0:
-            self.__network.addMultipleNodes(self.__network,state=0)
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__network.setFeature('state',0)
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
@@ -126,9 +133,9 @@ class MonteCarlo(object):
         {0:1,1:0,2:1,3:0}
         """
         if len(self.__sim_data) == 0:
-            for node in self.__network:
-                self.__network.add(node,state = random.randint(0,1))
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__network.setFeature('state',[random.randint(0,1) for
+                                               x in range(len(self.__network))])
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
             return  self.__sim_data
         else:
             raise ValueError("Must clear data before setting initial state.")
@@ -162,50 +169,46 @@ class MonteCarlo(object):
         {0:1,1:0,2:0,3:0,4:0}
         """
         if len(self.__sim_data) == 0:
-            self.__network.addMultipleNodes(self.__network,state=0)
+            self.__network.setFeature('state',0)
             self.__network.add(0,state = 1)
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
     def startUp(self):
         """Sets the inital state of all nodes to full or spin up."""
         if len(self.__sim_data) == 0:
-            self.__network.addMultipleNodes(self.__network,state=1)
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__network.setFeature('state',1)
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
     def startDown(self):
         """Sets the inital state of all nodes to spin down."""
         if len(self.__sim_data) == 0:
-            self.__network.addMultipleNodes(self.__network,state=-1)
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__network.setFeature('state',-1)
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
     def randomSpins(self):
         """Sets the inital state of all nodes to either spin up or spin down."""
         if len(self.__sim_data) == 0:
-            for node in self.__network:
-                self.__network.add(node,state = random.choice([-1,1]))
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            self.__network.setFeature('state',[random.choice([-1,1]) for
+                                               x in range(len(self.__network))])
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
     def senateDictionary(self, issue):
         if len(self.__sim_data) == 0:
             polarity = issue - 0.5
-            ideals = self.__network.getNodeFeature('ideology')
-            for node in self.__network:
-                eta = ideals[node] - self.getMedian()
-                probability = (eta*polarity + 0.34)/(0.68) ### CHANGE ###
-                if random.uniform(0, 1) <= probability:
-                    vote = 1
-                else:
-                    vote = 0
-                self.__network.add(node, state = vote)
-            self.__sim_data.append(self.__network.getNodeFeature('state'))
+            ideals = self.__network.getFeatureArray('ideology')
+            eta = ideals - self.getMedian()
+            probability = (eta*polarity + 0.34)/(0.68) ### CHANGE ###
+            draws = np.array([random.uniform(0, 1) for x in range(len(ideals))])
+            self.__network.setFeature('state',(draws <= probability).astype(int))
+            self.__sim_data.append(self.__network.getFeatureArray('state'))
         else:
             raise ValueError("Must clear data before setting initial state.")
 
@@ -218,14 +221,15 @@ class MonteCarlo(object):
 
     def temperature(self,nodes,temp):
         """Adds a temperature to a group of nodes."""
-        self.__network.addMultipleNodes(nodes,temperature=temp)
+        self.__network.setFeature('temperature',temp,nodes)
 
     #Analysis Methods
     def getZeros(self,timestep):
         """Finds the number of nodes with in the empty state at any given
         timestep.
 
-        This algorithm has a running time of $O(1)$.
+        This algorithm has a running time of $O(n)$, one NumPy sum over the
+        row of the timestep.
 
         Parameters
         ----------
@@ -255,13 +259,14 @@ class MonteCarlo(object):
         >>> mc.getZeros(0)
         1
         """
-        return len(self.__sim_data[timestep]) - self.getOnes(timestep)
+        return self.__sim_data.row(timestep).size - self.getOnes(timestep)
 
     def getOnes(self,timestep):
         """Finds the number of nodes with in the filled state at any given
         timestep.
 
-        This algorithm has a running time of $O(1)$.
+        This algorithm has a running time of $O(n)$, one NumPy sum over the
+        row of the timestep.
 
         Parameters
         ----------
@@ -291,7 +296,7 @@ class MonteCarlo(object):
         >>> mc.getOnes(0)
         3
         """
-        return sum(self.__sim_data[timestep].values())
+        return int(self.__sim_data.row(timestep).sum(dtype = np.int64))
 
     def neighborSum(self,node,state_d):
         """Takes the node number and caculates the sum of the nearest nieghbors.
@@ -333,15 +338,31 @@ class MonteCarlo(object):
         >>> mc.neighborSum('b')
         2
        """
+        if self.__network.isComplete():
+            return self._stateTotal(state_d) - state_d[node]
         return sum([state_d.get(x)
                     for x in self.__network.neighborFinder(node)])
 
+    def _stateTotal(self,state_d):
+        """Returns the sum of all states in a state dictionary. The total of
+        the last view from simData asked for is kept, so the closed form
+        neighbor sums of a complete graph cost $O(1)$ per node. Views never
+        change; a plain dictionary may be changed in place, so its total is
+        found again every time."""
+        if not isinstance(state_d,StateView):
+            return int(self._stateArray(state_d).sum())
+        if self.__total is None or self.__total[0] is not state_d:
+            self.__total = (state_d,int(self._stateArray(state_d).sum()))
+        return self.__total[1]
+
     def previousNeighbors(self,node):
         return sum([self.__simData[-1].get(x)
                     for x in self.__network.neighborFinder(node)])
 
     def neighborUnsum(self,node,state_d):
         """Returns sum(1-n) for nearest neighbors."""
+        if self.__network.isComplete():
+            return self.__network.degree(node) - self.neighborSum(node,state_d)
         return sum([(1-state_d.get(x))
                        for x in self.__network.neighborFinder(node)])
 
@@ -349,35 +370,70 @@ class MonteCarlo(object):
         """Gets the state of a node on an edge."""
         return timestep.get(neighbor)
 
+    def neighborSums(self,state_d):
+        """Takes a state dictionary and returns an array with the sum of the
+        states of the nearest neighbors of every node, in the order of
+        getNodes(). Uses the compiled CSRAdjacency of the network."""
+        return self.__network.adjacency().neighborSums(self._stateArray(state_d))
+
+    def _stateArray(self,state_d):
+        """Takes a state dictionary, a view from simData or an array and
+        returns an int64 array with the state of every node id. A view of
+        another network is read by node name, since its ids may differ."""
+        if isinstance(state_d,StateView) and state_d.network() is self.__network:
+            return state_d.array().astype(np.int64)
+        if isinstance(state_d,np.ndarray):
+            return state_d.astype(np.int64,copy = False)
+        nodes = self.__network.getNodes()
+        return np.fromiter((state_d[x] for x in nodes),dtype = np.int64,
+                           count = len(nodes))
+
     def density(self,gen,state_d):
         """Takes a generation and a state dictionary and returns the density
-           of the generation."""
+           of the generation. The densities of every generation are found
+           in one array pass and kept for the last view from simData, so
+           asking for each generation in turn costs $O(n)$ in total."""
         try:
-            nodes = self.__network.nodesPerGen(gen)
-            density = 0
-            for node in nodes:
-                density += state_d.get(node)
-            return density
+            return self.densities(state_d)[gen].item()
         except AttributeError:
             return "Inappropriate network type"
 
+    def densities(self,state_d):
+        """Takes a state dictionary and returns an array with the sum of the
+        states of every generation of a Cayley Tree. Only views from simData
+        are kept, since a plain dictionary may be changed in place."""
+        if not isinstance(state_d,StateView):
+            return self.__network.genReduce(self._stateArray(state_d))
+        if self.__densities is None or self.__densities[0] is not state_d:
+            states = self._stateArray(state_d)
+            self.__densities = (state_d,self.__network.genReduce(states))
+        return self.__densities[1]
+
     #Monte Carlo Algorithm methods
     def simulateNN(self,function = 'g*n+(1-n)*a*(b^s)'):
         """A monte carlo method that runs a timestep of a simulation
-        by visiting each node.
-
-        This method returns a dictionary of all the nodes and the state that
-        each node has. It iterates through the network and applies a probability
-        function to each node and generates a random number to try to satisfy
-        probability. If satisfied, the state of the node is changed and recorded
-        in the dictionary.
+        by updating every node at once.
+
+        It applies a probability function to each node, with a, b and g the
+        alpha, beta and gamma of the simulation, which may be numbers or
+        arrays with one value per node, s the sum of the states of
+        the nearest neighbors and n the state of the node, and draws a random
+        number to try to satisfy the probability. If satisfied, the state of
+        the node is changed. Every node sees the states of the previous
+        timestep.
 
-        This algorithm has a running time of $O(n)$ for $n$ nodes in a network.
+        This algorithm has a running time of $O(n + E)$ for $n$ nodes and $E$
+        links: the neighbor sums are one pass over the adjacency, the
+        function is evaluated once per distinct pair of state and neighbor
+        sum, and the random numbers are drawn as one array from the
+        generator of the simulation. The probabilities of every state and
+        neighbor sum are kept in a lookup table until the function, alpha,
+        beta, gamma or the links change, so a timestep costs one gather.
 
         Returns
         -------
-        self.__sim_data: a list containing the dictionaries of all the data
-                         for each node generated by previous timesteps.
+        self.__sim_data: the History of the states of all the nodes
+                         generated by previous timesteps.
         Notes
         -----
         -> This method only runs a single timestep.
@@ -403,65 +459,85 @@ class MonteCarlo(object):
 
         if len(self.__sim_data) == 0:
             raise ValueError("Must set up initial state of simulation")
-        list_cache = self.__sim_data
-        cache = dict()
-        for x in self.__network:
-            summ = self.neighborSum(x,list_cache[-1])
-            #print("summ: ", summ)
-            probability = evaluator(function,a=.5,b=.8,g=0,s=summ,
-                                    n=list_cache[-1][x])
-##            print("Test: ",probability)
-##            probability = self.gamma*list_cache[-1][x] + \
-##                                    (1 - list_cache[-1][x])*\
-##                                    self.alpha*(self.beta**(summ))
-##            print("Proven: ",probability)
-            if list_cache[-1][x] == 0 and \
-               random.uniform(0, 1) <= probability:
-                cache[x] = 1
-            elif list_cache[-1][x] == 1 and \
-                 random.uniform(0, 1) <= probability:
-                cache[x] = 0
-            else:
-                cache[x] = list_cache[-1][x]
-        #print("cache: ",cache)
-        list_cache.append(cache)
-        self.__sim_data = list_cache
+        previous = self.__sim_data.row(-1)
+        sums = self.neighborSums(previous)
+        probability = None
+        if not (np.ndim(self.alpha) or np.ndim(self.beta) or np.ndim(self.gamma)):
+            compiled = compileFunction(function)
+            probability = self._tabled('NN',(function,self.alpha,self.beta,
+                                             self.gamma,
+                                             self.__network.getModCount()),
+                np.zeros((len(previous),1)),0,1,
+                lambda constants,n,s: compiled.evaluateArrays(
+                    a=self.alpha,b=self.beta,g=self.gamma,s=s,n=n),
+                previous,sums)
+        if probability is None:
+            probability = self._probabilities(function,previous,sums)
+        flip = (self.rng.random(len(previous)) <= probability) & \
+               ((previous == 0) | (previous == 1))
+        self.__sim_data.append(np.where(flip,1 - previous,previous))
         return self.__sim_data
 
+    def _probabilities(self,function,states,sums):
+        """Returns an array with the probability function evaluated for every
+        node in array mode. When alpha, beta and gamma are numbers the
+        function only depends on the state and the neighbor sum of a node,
+        so it is evaluated on the distinct pairs and gathered; per node
+        alpha, beta or gamma arrays are evaluated node by node."""
+        probability = compileFunction(function) #parsed once per expression
+        if np.ndim(self.alpha) or np.ndim(self.beta) or np.ndim(self.gamma):
+            return probability.evaluateArrays(a=self.alpha,b=self.beta,
+                                              g=self.gamma,s=sums,n=states)
+        states = states.astype(np.int64)
+        if not len(states):
+            return np.zeros(0)
+        lowState,lowSum = int(states.min()),int(sums.min())
+        width = int(sums.max()) - lowSum + 1
+        keys = (states - lowState)*width + (sums - lowSum)
+        table = np.zeros(int(keys.max()) + 1)
+        pairs = np.flatnonzero(np.bincount(keys))
+        table[pairs] = probability.evaluateArrays(a=self.alpha,b=self.beta,
+                                                  g=self.gamma,
+                                                  s=pairs % width + lowSum,
+                                                  n=pairs//width + lowState)
+        return table[keys]
+
     def simulateEI(self):
         """Runs a timestep of a MonteCarlo by picking the edge and then a random
         node on the edge in order to use a probability function in oder to see a
         change of state."""
         if len(self.__sim_data) == 0:
             raise ValueError("Must set up initial state of simulation")
-        list_cache = self.__sim_data
-        cache = dict()
-        for x in self.__network.linksAsTuples():
+        previous = self.__sim_data.row(-1).tolist()
+        states = [None]*len(previous)
+        #the list of links is rebuilt only when the topology changes
+        edges = self.__network.derived('edgeLists',
+                                       lambda: self.__network.edgeArray().tolist())
+        for edge in edges:
             node_picked = random.randint(0,1)
-            summ = self.edgeSum(x[1-node_picked],list_cache[-1])
+            picked = edge[node_picked]
+            other = edge[1-node_picked]
+            summ = previous[other]
             #print("summ: ", summ)
-            probability = self.gamma*list_cache[-1][x[node_picked]] + \
-                                (1 - list_cache[-1][x[node_picked]])*\
+            probability = self.gamma*previous[picked] + \
+                                (1 - previous[picked])*\
                                 (self.r1*summ + self.r2*(1 - summ))
-            if list_cache[-1][x[node_picked]] == 0 and \
+            if previous[picked] == 0 and \
                random.uniform(0, 1) <= probability:
-                cache[x[node_picked]] = 1
-                #check to see if state of neighbor has changed before setting
-                #to original
-                if x[1-node_picked] not in cache:
-                    cache[x[1-node_picked]] = list_cache[-1][x[1-node_picked]]
-            elif list_cache[-1][x[node_picked]] == 1 and \
+                states[picked] = 1
+            elif previous[picked] == 1 and \
                  random.uniform(0, 1) <= probability:
-                cache[x[node_picked]] = 0
-                if x[1-node_picked] not in cache:
-                    cache[x[1-node_picked]] = list_cache[-1][x[1-node_picked]]
+                states[picked] = 0
             else:
-                cache[x[node_picked]] = list_cache[-1][x[node_picked]]
-                if x[1-node_picked] not in cache:
-                    cache[x[1-node_picked]] = list_cache[-1][x[1-node_picked]]
-        #print("cache: ",cache)
-        list_cache.append(cache)
-        self.__sim_data = list_cache
+                states[picked] = previous[picked]
+            #check to see if state of neighbor has changed before setting
+            #to original
+            if states[other] is None:
+                states[other] = previous[other]
+        for i in range(len(states)): #nodes without links keep their state
+            if states[i] is None:
+                states[i] = previous[i]
+        self.__sim_data.append(states)
         return self.__sim_data
 
     def simulateTL(self,timestep): #Only works for first timestep
@@ -471,96 +547,155 @@ class MonteCarlo(object):
         #no_nodes = (self.__network.links*(self.__network.links-1)**(self.__network.generations-1))
         if len(self.__sim_data) == 0:
             raise ValueError("Must set up initial state of simulation")
-        list_cache = self.__sim_data
-        cache = {}
+        previous = self.__sim_data.row(-1).tolist()
+        states = list()
         nodes = len(self.__network)
         if timestep == 0:
             dens = 0 #density function
         else:
             dens = self.getOnes(timestep)/nodes ### make sure this calls correct timestep
         #print("dens: " +str(dens))
-        for x in self.__network:
-            probability = self.gamma*list_cache[-1][x] + \
-                                    (1 - list_cache[-1][x])*(1-dens)*self.mu
+        for state in previous:
+            probability = self.gamma*state + \
+                                    (1 - state)*(1-dens)*self.mu
             #print("probability: " +str(probability))
-            if list_cache[-1][x] == 0 and \
+            if state == 0 and \
                random.uniform(0, 1) <= probability:
-                cache[x] = 1
+                states.append(1)
                 dens += 1/nodes
-            elif list_cache[-1][x] == 1 and \
+            elif state == 1 and \
                  random.uniform(0, 1) <= probability:
-                cache[x] = 0
+                states.append(0)
                 dens -= 1/nodes
             else:
-                cache[x] = list_cache[-1][x]
-        #print("cache: ",cache)
-        list_cache.append(cache)
-        self.__sim_data = list_cache
+                states.append(state)
+        #print("states: ",states)
+        self.__sim_data.append(states)
         return self.__sim_data
 
     def simulateTemp(self, k = 1, J = 1): #J needs to be renamed.
         """Simulates the Monte Carlo simulation on the Cayley Tree for one
            time step and stores that data. Uses temperature of nodes in
-           calculation of probabilty."""
+           calculation of probabilty. Nodes with the same temperature share
+           a lookup table of the probability for every state and neighbor
+           sum, which is built again when k, J, the temperatures or the links
+           change."""
         if len(self.__sim_data) == 0:
             raise ValueError("Must set up initial state of simulation")
-        list_cache = self.__sim_data
-        cache = dict()
-        temps = self.__network.getNodeFeature('temperature')
-        for x in self.__network:
-            beta = (1/k)*temps[x]
-            summ = self.neighborSum(x,list_cache[-1])
-            #print("summ: ", summ)
-            probability = 0.5*(1-list_cache[-1][x]*np.tanh(beta*J*summ))
-            if list_cache[-1][x] == -1 and \
-               random.uniform(0, 1) <= probability:
-                cache[x] = 1
-            elif list_cache[-1][x] == 1 and \
-                 random.uniform(0, 1) <= probability:
-                cache[x] = -1
-            else:
-                cache[x] = list_cache[-1][x]
-        #print("cache: ",cache)
-        list_cache.append(cache)
-        self.__sim_data = list_cache
+        temps = self.__network.getFeatureArray('temperature')
+        previous = self.__sim_data.row(-1)
+        sums = self.neighborSums(previous)
+        probability = self._tabled('Temp',(k,J,self.__network.getModCount()),
+            temps.reshape(-1,1),-1,1,
+            lambda constants,n,s: 0.5*(1-n*np.tanh((1/k)*constants[...,0]*J*s)),
+            previous,sums)
+        if probability is None:
+            probability = 0.5*(1-previous*np.tanh((1/k)*temps*J*sums))
+        flip = (self.rng.random(len(previous)) <= probability) & \
+               ((previous == -1) | (previous == 1))
+        self.__sim_data.append(np.where(flip,-previous,previous))
         return self.__sim_data
 
     def simulateVote(self): ### Set up senate object with neighbors, alpha, beta, gamma, phi,
+        """Runs a timestep of the senate voting model. Senators with the
+        same beta, phi and number of neighbors share a lookup table of the
+        probability for every state and neighbor sum, which is built again
+        when alpha, gamma, beta, phi or the links change."""
         if len(self.__sim_data) == 0:  ### neighborSum function
             raise ValueError("Must set up initial state of simulation")
-        list_cache = self.__sim_data
-        cache = dict()
-        beta_d = self.__network.getNodeFeature('beta')
-        phi_d = self.__network.getNodeFeature('phi')
-        for x in self.__network:
-            beta = beta_d[x]
-            phi = phi_d[x]
-            summ = self.neighborSum(x,list_cache[-1])
-            unsumm = self.neighborUnsum(x,list_cache[-1])
-            probability = self.gamma*list_cache[-1][x]*(phi**unsumm) + \
-                                    (1 - list_cache[-1][x])*\
-                                    self.alpha*(beta**(summ))
-            if list_cache[-1][x] == 0 and \
-               random.uniform(0, 1) <= probability:
-                cache[x] = 1
-            elif list_cache[-1][x] == 1 and \
-                 random.uniform(0, 1) <= probability:
-                cache[x] = 0
-            else:
-                cache[x] = list_cache[-1][x]
-        list_cache.append(cache)
-        self.__sim_data = list_cache
+        betas = self.__network.getFeatureArray('beta')
+        phis = self.__network.getFeatureArray('phi')
+        degrees = self.__network.degreeVector()
+        previous = self.__sim_data.row(-1)
+        sums = self.neighborSums(previous)
+        probability = self._tabled('Vote',(self.alpha,self.gamma,
+                                           self.__network.getModCount()),
+            np.column_stack((betas,phis,degrees)),0,1,
+            lambda constants,n,s: self.gamma*n*(constants[...,1]**
+                                                (constants[...,2] - s)) + \
+                                  (1 - n)*self.alpha*(constants[...,0]**s),
+            previous,sums)
+        if probability is None:
+            unsums = degrees - sums
+            probability = self.gamma*previous*(phis**unsums) + \
+                          (1 - previous)*self.alpha*(betas**sums)
+        flip = (self.rng.random(len(previous)) <= probability) & \
+               ((previous == 0) | (previous == 1))
+        self.__sim_data.append(np.where(flip,1 - previous,previous))
         return self.__sim_data
 
+    def _tabled(self,name,key,constants,low,high,rule,states,sums):
+        """Returns the probability of every node from the lookup table kept
+        under name, or None when a state is outside low to high or the table
+        would be larger than the network. Nodes with the same row of
+        constants are a class, and the table holds rule(constants, n, s)
+        for every class, state from low to high and possible neighbor sum.
+        The table is built again when key changes or the constants differ
+        from the ones it was built from. The constants are compared value by
+        value, since writes to a feature column do not change the version
+        of the feature store."""
+        if not len(states) or states.min() < low or states.max() > high:
+            return None
+        entry = self.__tables.get(name)
+        if entry is None or entry[0] != key or \
+           not np.array_equal(entry[1],constants,equal_nan = True):
+            entry = (key,np.array(constants)) + \
+                    self._buildTable(constants,low,high,rule)
+            self.__tables[name] = entry
+        key,constants,classes,lowSum,table = entry
+        if table is None:
+            return None
+        return table[classes,states - low,sums - lowSum]
+
+    def _buildTable(self,constants,low,high,rule):
+        """Returns the class of every node, the lowest neighbor sum and the
+        table of rule over every class, state and neighbor sum, or None for
+        the table when it does not pay off or the rule fails on it."""
+        degrees = self.__network.degreeVector()
+        degree = int(degrees.max()) if len(degrees) else 0
+        lowSum,highSum = degree*min(low,0),degree*max(high,0)
+        values,classes = np.unique(constants,axis = 0,return_inverse = True)
+        classes = classes.ravel()
+        if len(values)*(high - low + 1)*(highSum - lowSum + 1) > \
+           4*len(constants) + 1024:
+            return classes,lowSum,None
+        c,n,s = np.meshgrid(np.arange(len(values)),np.arange(low,high + 1),
+                            np.arange(lowSum,highSum + 1),indexing = 'ij')
+        try:
+            with np.errstate(all = 'ignore'): #entries no node can reach
+                table = np.asarray(rule(values[c],n,s),dtype = float)
+        except (ZeroDivisionError,ValueError):
+            return classes,lowSum,None
+        return classes,lowSum,np.broadcast_to(table,c.shape)
+
     def clear(self):
         """Clears the data from the tree."""
-        self.__sim_data = list()
+        self.__sim_data = History(self.__network)
+
+    def growNetwork(self,generations = 1,state = 0,**kwargs):
+        """Appends generations to the Cayley Tree of the simulation so a run
+        can go on on a deeper tree. The new nodes are given the state at
+        every timestep so far, so the next timestep starts from it. kwargs
+        sets other features of the new nodes."""
+        self.__network.grow(generations,state = state,**kwargs)
+        #the new nodes come after the old ones
+        self.__sim_data.resize(self.__network.nodeNumber(),state)
+        self.__total = None
+        self.__densities = None
 
     #Data Export Methods
     def simData(self,timestep):
-        """Returns the sim data at a certain timestep."""
+        """Returns the sim data at a certain timestep, as a read-only
+        dictionary-like view of node to state."""
         return self.__sim_data[timestep]
 
+    def simArray(self,timestep = None):
+        """Returns the read-only (timesteps, nodes) int8 array of the states
+        of every node id at every timestep, or only the row of a timestep."""
+        if timestep is None:
+            return self.__sim_data.array()
+        return self.__sim_data.row(timestep)
+
     def previousState(self,node):
         """Returns the state of the node from the previous timestep."""
         return self.__sim_data[-1][node]
@@ -569,18 +704,13 @@ class MonteCarlo(object):
         """A file that sends the data ran from the most recent
            MonteCarlo().simulate to an excel sheet. Must run the simulate
            method in order to have this method work."""
-        if self.__sim_data == list():
+        if len(self.__sim_data) == 0:
             raise ValueError("No data to send to excel. Must run simulation")
         workbook = xlsxwriter.Workbook(filename)
         worksheet = workbook.add_worksheet("Monte Carlo Data")
         worksheet.write(0,0,"Timestep")
-        try:
-            for x in self.__network:
-                worksheet.write(x+1,0,"Node "+ str(self.__network.keys[x]))
-        except TypeError:
-            rank_d = self.__network.getNodeFeature('rank')
-            for x in self.__network:
-                worksheet.write(int(rank_d[x]),0,x)
+        for row,node in enumerate(self.__network.getNodes()):
+            worksheet.write(row+1,0,"Node "+ str(node))
         for y in range(len(self.__sim_data[0])):
             worksheet.write(0,y+1,str(y))
         for y in range(len(self.__sim_data)):
@@ -602,8 +732,9 @@ class MonteCarlo(object):
             for y in range(len(self.__sim_data[0])):
                 worksheet2.write(0,y+1,str(y))
             for y in range(len(self.__sim_data)):
+                states = self.__sim_data[y] #densities are kept per view
                 for x in range(self.__network.generations+1):
-                    worksheet2.write(x+1,y+1,self.density(x,self.__sim_data[y]))
+                    worksheet2.write(x+1,y+1,self.density(x,states))
         worksheet3 = workbook.add_worksheet("Total Density")
         worksheet3.write(0,0,'Timestep')
         worksheet3.write(1,0,"Density")
@@ -1,5 +1,6 @@
 from Cayley.parser.abstractcollection import *
 from Cayley.parser.abstractstack import *
+from Cayley.parser.compiler import *
 from Cayley.parser.evaluator import *
 from Cayley.parser.linkedstack import *
 from Cayley.parser.node import *
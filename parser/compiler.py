@@ -0,0 +1,110 @@
+"""
+Author: Justin Pusztay
+Filename: compiler.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the CompiledFunction class and compileFunction. A probability
+function is scanned and translated to postfix once, and the postfix is turned
+into a Python function of the variables of the expression. compileFunction
+keeps the most recently used expressions, so a simulation that evaluates the
+same function for every node parses it only once. The compiled function also
+evaluates over whole NumPy arrays, one ufunc per operator, so it can give the
+probability of every node of a network at once.
+"""
+
+__author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)'])
+
+__all__ = ['CompiledFunction','compileFunction']
+
+from functools import lru_cache
+import numpy as np
+from Cayley.parser.tokens import Token
+from Cayley.parser.scanner import Scanner
+from Cayley.parser.translator import Translator
+
+class CompiledFunction(object):
+    """A probability function compiled into a Python function. Calling it
+    with the values of the variables as keywords gives the same value as
+    evaluating the expression with the Evaluator, including the floor
+    division of '/'. Keywords for variables the expression does not use are
+    ignored."""
+
+    OPERATORS = {Token.PLUS: '+', Token.MINUS: '-', Token.MUL: '*',
+                 Token.DIV: '//', Token.MOD: '%', Token.POWER: '**'}
+
+    def __init__(self,function):
+        """Parses the function into postfix and compiles it."""
+        self.function = function
+        try:
+            self.postfix = Translator(Scanner(function)).translate()
+        except Exception as e:
+            raise ValueError("Cannot parse " + repr(function) + ": " + str(e))
+        self.variables = sorted({token.getValue() for token in self.postfix
+                                 if token.getType() == Token.VAR})
+        self.expression = self._build()
+        self._function = eval("lambda " + ", ".join(self.variables +
+                                                    ["**unused"]) +
+                              ": " + self.expression,{'__builtins__': {}})
+
+    def __call__(self,**kwargs):
+        """Returns the value of the function for the values of the
+        variables."""
+        return self._function(**kwargs)
+
+    def evaluateArrays(self,**kwargs):
+        """Returns an array with the value of the function for values given
+        as arrays or scalars, such as s and n with one entry per node and a,
+        b and g as numbers or per node arrays. The values are broadcast
+        together and computed as floats, like the numbers of the Evaluator,
+        and the result has the broadcast shape of every value given.
+        A division by zero raises ZeroDivisionError and any other invalid
+        operation, such as 0%0 or a negative number to a fractional power,
+        raises ValueError."""
+        values = {name: np.asarray(kwargs[name],dtype = float)
+                  for name in self.variables if name in kwargs}
+        with np.errstate(divide = 'raise',invalid = 'raise'):
+            try:
+                result = np.asarray(self._function(**values),dtype = float)
+            except FloatingPointError as e:
+                if 'divide' in str(e):
+                    raise ZeroDivisionError("Attempt to divide by 0")
+                raise ValueError(str(e) + " in " + repr(self.function))
+        shape = np.broadcast_shapes(*(np.shape(value) for value in
+                                      kwargs.values()))
+        if result.shape != shape: #a function without the arrays given
+            result = np.array(np.broadcast_to(result,shape))
+        return result
+
+    def __str__(self):
+        """Returns the Python expression the function was compiled to."""
+        return self.expression
+
+    def _build(self):
+        """Returns the source of a Python expression equal to the postfix,
+        found by running the postfix on a stack of source strings."""
+        stack = list()
+        for token in self.postfix:
+            if token.getType() in (Token.INT,Token.FLOAT):
+                stack.append(repr(float(token.getValue())))
+            elif token.getType() == Token.VAR:
+                stack.append(token.getValue())
+            elif token.getType() in CompiledFunction.OPERATORS:
+                if len(stack) < 2:
+                    raise ValueError("Missing operand in " + repr(self.function))
+                right = stack.pop()
+                left = stack.pop()
+                stack.append("(" + left + " " +
+                             CompiledFunction.OPERATORS[token.getType()] +
+                             " " + right + ")")
+            else:
+                raise ValueError("Unknown symbol " + repr(str(token)) +
+                                 " in " + repr(self.function))
+        if len(stack) != 1:
+            raise ValueError("Missing operator in " + repr(self.function))
+        return stack[0]
+
+@lru_cache(maxsize = 128)
+def compileFunction(function):
+    """Returns the CompiledFunction of an expression. The 128 expressions
+    used most recently are kept, so each is parsed only once."""
+    return CompiledFunction(function)
@@ -11,35 +11,25 @@ equation by translating the function to postfix notation and evaluating it there
 
 __author__ = "\n".join(['Justin Pusztay (pusztayj20@mail.wlu.edu)'])
 
-__all__ = ['evaluator']
+__all__ = ['evaluator','arrayEvaluator']
 
-from Cayley.parser.scanner import Scanner
-from Cayley.parser.translator import Translator
-from Cayley.parser.evaluator import Evaluator
+from Cayley.parser.compiler import compileFunction
 
 
 def evaluator(function,**kwargs):
-    """Plugs in values for the variables and then evaluates the expression."""
-    variables = findVariables(function)
-    variables.update(kwargs)
-    for var in variables:
-        function = function.replace(var,str(variables[var]))
+    """Plugs in values for the variables and then evaluates the expression.
+    The expression is parsed only the first time it is seen; afterwards the
+    cached CompiledFunction is called with the values."""
     try:
-        scanner = Scanner(function)
-        translator = Translator(scanner)
-        postfix = translator.translate()
-        evaluator = Evaluator(postfix)
-        return evaluator.evaluate()
+        return compileFunction(function)(**kwargs)
     except Exception as e:
-        print("Error:", e, translator.translationStatus())
-
-def findVariables(function):
-    """Finds the variables in the probability function."""
-    variables = dict()
-    for char in function:
-        if char.lower() in "abcdefghigjklmnopqrstuvwxyz":
-            variables[char] = None
-    return variables
+        print("Error:", e)
+
+def arrayEvaluator(function,**kwargs):
+    """Evaluates the expression over NumPy arrays. Variables can be arrays,
+    such as a state and a neighbor sum per node, or scalars, and are
+    broadcast together. Returns an array of the values."""
+    return compileFunction(function).evaluateArrays(**kwargs)
 
 #Example of how the Probility object can be used
 def main():
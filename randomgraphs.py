@@ -0,0 +1,268 @@
+"""
+Filename: randomgraphs.py
+Project: Research for Irina Mazilu, Ph.D.
+
+This file contains random network classes: the Erdos-Renyi, Barabasi-Albert,
+Watts-Strogatz and random regular graphs. Like an implicit CayleyTree their
+nodes are the ids 0 to nodeNumber()-1. The links are drawn as NumPy arrays
+with a seeded random generator and frozen straight into a CSRAdjacency, so
+no Python code runs per node or link and a million node graph takes seconds.
+The same seed always gives the same graph.
+"""
+
+__all__ = ['RandomGraph','ErdosRenyi','BarabasiAlbert','WattsStrogatz',
+           'RandomRegular']
+
+from abc import ABCMeta, abstractmethod
+from Cayley.abstractnetwork import *
+from Cayley.adjacency import CSRAdjacency
+import numpy as np
+
+def _unique(keys):
+    """Returns the sorted distinct values of an integer array. Sorting and
+    comparing neighbors is much faster than np.unique for large arrays."""
+    keys = np.sort(keys)
+    return keys[np.diff(keys,prepend = keys[:1] - 1) != 0]
+
+def _contains(ordered,values):
+    """Returns a boolean array telling which values are in the sorted
+    array."""
+    if not len(ordered):
+        return np.zeros(len(values),dtype = bool)
+    found = np.minimum(np.searchsorted(ordered,values),len(ordered) - 1)
+    return ordered[found] == values
+
+class RandomGraph(AbstractNetwork,metaclass = ABCMeta):
+    """The abstract base class of the random networks. Subclasses set their
+    parameters and implement _generate, which takes a NumPy Generator and
+    returns the (E,2) array of links."""
+
+    def __init__(self,nodes,seed = None):
+        """Draws the links of a random graph with the number of nodes given.
+        seed is anything np.random.default_rng takes."""
+        if nodes < 0:
+            raise ValueError("A graph cannot have a negative number of nodes.")
+        self.n = nodes
+        self.seed = seed
+        self.keys = range(nodes)
+        AbstractNetwork.__init__(self)
+        self.autoCreate()
+
+    def __eq__(self,other):
+        """Two random graphs are equal when they are the same kind of graph
+        with the same parameters and seed, which means the same links."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.parameters() == other.parameters() and \
+               self.seed is not None and self.seed == other.seed
+
+    def getType(self):
+        """Quick fix for MonteCarlo."""
+        return type(self).__name__
+
+    def nodeNumber(self):
+        """Returns the total number of nodes in the graph."""
+        return self.n
+
+    def parameters(self):
+        """Returns a tuple with the parameters of the graph."""
+        return (self.n,)
+
+    def autoCreate(self):
+        """Draws the links and freezes them into a CSRAdjacency."""
+        edges = self._generate(np.random.default_rng(self.seed))
+        self._implicitNodes(CSRAdjacency.fromEdges(edges,self.n))
+
+    def linkArray(self):
+        """Returns an (E,2) array with the positions of the two nodes of every
+        link."""
+        return self.edgeArray()
+
+    @abstractmethod
+    def _generate(self,rng):
+        """Returns the (E,2) array of links."""
+
+    def _simple(self,edges):
+        """Returns the links without self-links, with every repeated link
+        once, as (i,j) with i < j."""
+        edges = np.sort(edges,axis = 1)
+        edges = edges[edges[:,0] != edges[:,1]]
+        keys = _unique(edges[:,0]*np.int64(self.n) + edges[:,1])
+        return np.column_stack((keys//self.n,keys%self.n))
+
+class ErdosRenyi(RandomGraph):
+    """The G(n,p) random graph, where every pair of nodes is linked with
+    probability p."""
+
+    def __init__(self,nodes,p,seed = None):
+        """Sets the link probability and draws the graph."""
+        if not 0 <= p <= 1:
+            raise ValueError("The link probability must be between 0 and 1.")
+        self.p = p
+        RandomGraph.__init__(self,nodes,seed)
+
+    def parameters(self):
+        """Returns a tuple with the parameters of the graph."""
+        return (self.n,self.p)
+
+    def _generate(self,rng):
+        """Draws the number of links from the binomial distribution, then
+        that many distinct pairs out of the n(n-1)/2 possible ones without
+        replacement, and decodes each pair number into its two nodes. When
+        most pairs are linked the missing pairs are drawn instead and every
+        other pair is kept. The cost is in the number of links, not in the
+        number of pairs."""
+        n = self.n
+        pairs = n*(n-1)//2
+        count = rng.binomial(pairs,self.p) if pairs else 0
+        if 2*count > pairs: #draw the smaller set of pairs
+            linked = np.ones(pairs,dtype = bool)
+            linked[rng.choice(pairs,pairs - count,replace = False)] = False
+            keys = np.flatnonzero(linked)
+        else:
+            keys = np.sort(rng.choice(pairs,count,replace = False))
+        #pair k is (i,j) with i < j, counting row by row of the upper triangle
+        i = n - 2 - np.floor(np.sqrt(4*n*(n-1) - 8*keys.astype(float) - 7)/2
+                             - 0.5).astype(np.int64)
+        first = i*(2*n - i - 1)//2 #the number of the pair (i,i+1)
+        i = np.where(first > keys,i - 1,i) #rounding can be one row off
+        first = i*(2*n - i - 1)//2
+        i = np.where(keys - first >= n - 1 - i,i + 1,i)
+        first = i*(2*n - i - 1)//2
+        return np.column_stack((i,keys - first + i + 1))
+
+class BarabasiAlbert(RandomGraph):
+    """The Barabasi-Albert preferential attachment graph, where each node
+    links to m earlier nodes chosen with probability proportional to their
+    degree."""
+
+    def __init__(self,nodes,m,seed = None):
+        """Sets the number of links each new node makes and draws the
+        graph."""
+        if m < 1:
+            raise ValueError("Each node must make at least one link.")
+        self.m = m
+        RandomGraph.__init__(self,nodes,seed)
+
+    def parameters(self):
+        """Returns a tuple with the parameters of the graph."""
+        return (self.n,self.m)
+
+    def _generate(self,rng):
+        """Uses the Batagelj-Brandes method: link k of node v is stored at
+        positions 2k and 2k+1 of an array, with v at 2k and, at 2k+1, the
+        node found at a uniformly drawn earlier position, which picks nodes
+        in proportion to their degree. Every draw is made at once and the
+        positions that point at another 2k+1 are resolved by pointer
+        jumping, a few array passes instead of a loop over nodes. Self-links
+        and repeated links are dropped, so a few nodes end up with fewer
+        than m links."""
+        total = self.n*self.m
+        if total == 0:
+            return np.zeros((0,2),dtype = np.int64)
+        k = np.arange(total,dtype = np.int64)
+        pointer = (rng.random(total)*(2*k + 1)).astype(np.int64) #in [0,2k]
+        odd = pointer % 2 == 1
+        while odd.any(): #an odd position copies the target of link (p-1)/2
+            pointer[odd] = pointer[(pointer[odd] - 1)//2]
+            odd = pointer % 2 == 1
+        return self._simple(np.column_stack((k//self.m,pointer//2//self.m)))
+
+class WattsStrogatz(RandomGraph):
+    """The Watts-Strogatz small world graph: a ring where every node is
+    linked to its k nearest nodes, k/2 on each side, after which each link
+    is rewired to a random node with probability p."""
+
+    def __init__(self,nodes,k,p,seed = None):
+        """Sets the ring degree and the rewiring probability and draws the
+        graph."""
+        if k % 2 or not 0 <= k < nodes:
+            raise ValueError("k must be even and smaller than the number of nodes.")
+        if not 0 <= p <= 1:
+            raise ValueError("The rewiring probability must be between 0 and 1.")
+        self.k = k
+        self.p = p
+        RandomGraph.__init__(self,nodes,seed)
+
+    def parameters(self):
+        """Returns a tuple with the parameters of the graph."""
+        return (self.n,self.k,self.p)
+
+    def _generate(self,rng):
+        """Builds the ring links, then moves the far end of the links picked
+        for rewiring to random nodes. Moves that would make a self-link or
+        repeat a link are drawn again, in rounds over the whole array."""
+        n = self.n
+        nodes = np.arange(n,dtype = np.int64)
+        source = np.tile(nodes,self.k//2)
+        target = (source + np.repeat(np.arange(1,self.k//2 + 1),n)) % n
+        rewire = np.flatnonzero(rng.random(len(source)) < self.p)
+        keys = np.minimum(source,target)*n + np.maximum(source,target)
+        for attempt in range(100):
+            if not len(rewire):
+                break
+            fresh = rng.integers(0,n,len(rewire))
+            new = np.minimum(source[rewire],fresh)*n + \
+                  np.maximum(source[rewire],fresh)
+            ok = (fresh != source[rewire]) & \
+                 ~_contains(np.sort(np.delete(keys,rewire)),new) #staying links
+            once = np.zeros(len(new),dtype = bool) #one of each new link
+            once[np.unique(new,return_index = True)[1]] = True
+            ok &= once
+            target[rewire[ok]] = fresh[ok]
+            keys[rewire[ok]] = new[ok]
+            rewire = rewire[~ok]
+        #links that found no free node keep their ring end
+        return self._simple(np.column_stack((source,target)))
+
+class RandomRegular(RandomGraph):
+    """A random graph where every node has degree d."""
+
+    def __init__(self,nodes,d,seed = None):
+        """Sets the degree and draws the graph."""
+        if nodes*d % 2 or not 0 <= d < max(nodes,1):
+            raise ValueError("Need d < nodes and an even number of link ends.")
+        self.d = d
+        RandomGraph.__init__(self,nodes,seed)
+
+    def parameters(self):
+        """Returns a tuple with the parameters of the graph."""
+        return (self.n,self.d)
+
+    def _generate(self,rng):
+        """Uses the configuration model: d ends per node are shuffled and
+        paired into links. The ends of self-links and repeated links are
+        shuffled again together with twice as many randomly chosen good
+        links, until every link is simple. A graph with d above (n-1)/2 is
+        drawn as the complement of one with degree n-1-d, which pairs far
+        more easily."""
+        n = self.n
+        if 2*self.d <= n - 1:
+            return self._pair(n,self.d,rng)
+        missing = self._pair(n,n - 1 - self.d,rng)
+        linked = np.ones((n,n),dtype = bool)
+        linked[missing[:,0],missing[:,1]] = False
+        linked[missing[:,1],missing[:,0]] = False
+        return np.argwhere(np.triu(linked,1))
+
+    def _pair(self,n,d,rng):
+        """Returns the links of a simple d-regular graph on n nodes drawn
+        with the configuration model."""
+        ends = rng.permutation(np.repeat(np.arange(n,dtype = np.int64),d))
+        edges = ends.reshape(-1,2)
+        for attempt in range(1000):
+            keys = np.minimum(edges[:,0],edges[:,1])*n + \
+                   np.maximum(edges[:,0],edges[:,1])
+            bad = np.ones(len(edges),dtype = bool)
+            bad[np.unique(keys,return_index = True)[1]] = False
+            bad |= edges[:,0] == edges[:,1]
+            if not bad.any():
+                return edges
+            good = np.flatnonzero(~bad)
+            extra = rng.choice(good,min(len(good),2*int(bad.sum())),
+                               replace = False)
+            redo = np.concatenate((np.flatnonzero(bad),extra))
+            edges[redo] = rng.permutation(edges[redo].ravel()).reshape(-1,2)
+        raise ValueError("Could not draw a simple regular graph.")
@@ -0,0 +1,113 @@
+"""
+Filename: storage.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains save and read, which write a network to a single binary .npz file
+and read its arrays back for AbstractNetwork.load. The file holds the
+compiled links as CSR arrays, the node names, every feature column and the
+attributes of the network class, so loading does not rebuild the network
+from its constructor.
+
+The arrays are stored uncompressed, which lets read memory-map them straight
+from the file. A memory-mapped network opens in the time it takes to read
+the small header, whatever its size, and several processes that map the same
+file share its pages. The links are mapped read-only. The feature columns are
+mapped copy-on-write: a simulation can still set states, and its writes stay
+private to the process.
+"""
+
+__all__ = ['save','read']
+
+import importlib
+import struct
+import zipfile
+import numpy as np
+from Cayley.adjacency import CSRAdjacency
+
+#attributes of AbstractNetwork that are saved as arrays, not pickled
+_STORED = ('nodes','keys','graph','features','_index','_adjacency',
+           '_derived','_modCount','_nodeCount','_featureDigest','_permutation')
+
+def save(network,path):
+    """Writes the network to path as an uncompressed .npz file. Links kept
+    as neighbor sets are compiled to CSR first. Implicit topologies are
+    small and are saved as they are."""
+    arrays = dict()
+    adjacency = network.adjacency()
+    if isinstance(adjacency,CSRAdjacency):
+        arrays['indptr'] = adjacency.indptr
+        arrays['indices'] = adjacency.indices
+    else:
+        arrays['implicit'] = _pickled(adjacency)
+    nodes = network.getNodes()
+    if isinstance(nodes,range) or \
+       (len(nodes) and all(type(n) is int for n in nodes) and
+        nodes == list(range(len(nodes)))):
+        arrays['size'] = np.array(len(nodes))
+    else:
+        arrays['nodes'] = _pickled(list(nodes))
+    if network._permutation is not None: #the ids were reordered
+        arrays['permutation'] = network._permutation
+    store = network.features
+    for name in store.names():
+        column = store.column(name)
+        arrays['feature/' + name] = _pickled(column) if column.dtype == object \
+                                    else column
+        arrays['present/' + name] = store.present(name)
+    attributes = {key: value for key,value in vars(network).items()
+                  if key not in _STORED}
+    arrays['attributes'] = _pickled(attributes)
+    arrays['class'] = np.array(type(network).__module__ + ':' +
+                               type(network).__name__)
+    with open(path,'wb') as handle: #np.savez would add .npz to the name
+        np.savez(handle,**arrays)
+
+def read(path,mmap = False):
+    """Reads the arrays of a file written by save into a dictionary. With
+    mmap, the arrays are mapped from the file instead of read into memory.
+    Pickled values are unwrapped and the class is imported.
+
+    The file is unpickled for its attributes, so only read files you
+    trust."""
+    with np.load(path,allow_pickle = True) as archive:
+        mapped = _mapArrays(path) if mmap else dict()
+        arrays = {name: mapped[name] if name in mapped else archive[name]
+                  for name in archive.files}
+    for name,value in arrays.items():
+        if value.dtype == object and value.ndim == 0:
+            arrays[name] = value.item()
+    module,name = str(arrays['class']).split(':')
+    arrays['class'] = getattr(importlib.import_module(module),name)
+    return arrays
+
+def _pickled(value):
+    """Wraps a value in a 0-d object array so np.savez pickles it."""
+    wrapped = np.empty((),dtype = object)
+    wrapped[()] = value
+    return wrapped
+
+def _mapArrays(path):
+    """Returns a dictionary with a memory map of every array of the .npz
+    file that is stored uncompressed and holds no Python objects. The links
+    are mapped read-only and everything else copy-on-write."""
+    mapped = dict()
+    with zipfile.ZipFile(path) as archive, open(path,'rb') as handle:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                continue
+            handle.seek(info.header_offset)
+            header = struct.unpack('<4s5H3I2H',handle.read(30))
+            handle.seek(header[-2] + header[-1],1) #skip the name and extra
+            version = np.lib.format.read_magic(handle)
+            if version == (1,0):
+                shape,fortran,dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape,fortran,dtype = np.lib.format.read_array_header_2_0(handle)
+            if dtype.hasobject or not shape or 0 in shape:
+                continue
+            name = info.filename[:-4] #drops .npy
+            mode = 'r' if name in ('indptr','indices') else 'c'
+            mapped[name] = np.memmap(path,dtype = dtype,mode = mode,
+                                     offset = handle.tell(),shape = shape,
+                                     order = 'F' if fortran else 'C')
+    return mapped
@@ -0,0 +1,67 @@
+"""
+Filename: test_adjacency.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the neighbor sums of every adjacency backend against a loop over the
+neighbors of each node.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+
+def networks():
+    """Returns networks backed by each kind of adjacency."""
+    complete = cy.Graph()
+    for node in range(6):
+        complete.add(node)
+    complete.completeGraph()
+    return {'graph': cy.BarabasiAlbert(200,3,seed = 0),
+            'csr': cy.CayleyTree(4,3),
+            'tree': cy.CayleyTree(5,4,implicit = True),
+            'lattice': cy.Lattice(4,5,3,periodic = (True,False,True),
+                                  implicit = True),
+            'hyperlattice': cy.HyperLattice((3,4,2,3),periodic = True),
+            'complete': complete,
+            'view': cy.CayleyTree(4,3,implicit = True).generationView(3)}
+
+def loopSums(network,values):
+    """Returns the sum of the values of the neighbors of every node, one
+    Python int at a time."""
+    return [sum(int(values[network.indexOf(neighbor)])
+                for neighbor in network.neighborFinder(node))
+            for node in network.getNodes()]
+
+@pytest.mark.parametrize('name',sorted(networks()))
+def test_neighborSums_matches_loop(name):
+    network = networks()[name]
+    values = np.random.default_rng(1).integers(-5,6,len(network))
+    sums = network.adjacency().neighborSums(values)
+    assert sums.tolist() == loopSums(network,values)
+
+@pytest.mark.parametrize('name',sorted(networks()))
+def test_neighborSums_widens_int8(name):
+    network = networks()[name]
+    values = np.full(len(network),100,dtype = np.int8)
+    sums = network.adjacency().neighborSums(values)
+    assert sums.dtype == np.int64
+    assert sums.tolist() == loopSums(network,values)
+
+def test_neighborSums_of_high_degree_int8_states():
+    network = cy.BarabasiAlbert(3000,3,seed = 0)
+    ones = np.ones(len(network),dtype = np.int8)
+    sums = network.adjacency().neighborSums(ones)
+    assert sums.tolist() == network.adjacency().degrees().tolist()
+    assert sums.max() > 127
+
+def test_neighborSums_keeps_float_precision():
+    network = cy.BarabasiAlbert(200,3,seed = 0)
+    values = np.random.default_rng(2).random(len(network))
+    values[0] = 1e20
+    sums = network.adjacency().neighborSums(values)
+    far = np.ones(len(network),dtype = bool) #rows that do not see 1e20
+    far[network.adjacency().neighbors(0)] = False
+    loop = [sum(values[network.indexOf(neighbor)]
+                for neighbor in network.neighborFinder(node))
+            for node in network.getNodes()]
+    assert np.allclose(sums[far],np.array(loop)[far],rtol = 0,atol = 1e-9)
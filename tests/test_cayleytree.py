@@ -0,0 +1,61 @@
+"""
+Filename: test_cayleytree.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the array reductions of the CayleyTree against per generation loops
+and that a grown tree is the tree built with the same generations.
+"""
+
+import random
+import numpy as np
+import pytest
+import Cayley as cy
+
+def loopReduce(tree,values):
+    """Returns the sum of the values of every generation, one Python int at
+    a time."""
+    return [sum(int(values[i]) for i in tree.nodesPerGen(gen))
+            for gen in range(tree.generations+1)]
+
+def test_genReduce_matches_loop():
+    rng = np.random.default_rng(0)
+    for implicit in (False,True):
+        tree = cy.CayleyTree(6,4,implicit = implicit)
+        values = rng.integers(-3,4,len(tree))
+        assert tree.genReduce(values).tolist() == loopReduce(tree,values)
+        assert tree.genReduce(values,'count').tolist() == \
+               loopReduce(tree,values != 0)
+
+def test_genReduce_widens_int8_states():
+    tree = cy.CayleyTree(7,3)
+    monte = cy.MonteCarlo(tree)
+    monte.startUp()
+    states = monte.simArray(0)
+    assert states.dtype == np.int8
+    assert tree.genReduce(states).tolist() == loopReduce(tree,states)
+    assert np.allclose(tree.genReduce(states,'mean'),1)
+
+@pytest.mark.parametrize('kind',('explicit','implicit','loaded'))
+def test_grow_matches_built_tree(tmp_path,kind):
+    tree = cy.CayleyTree(3,3,implicit = kind == 'implicit')
+    if kind == 'loaded':
+        path = str(tmp_path/"tree.npz")
+        tree.save(path)
+        tree = cy.CayleyTree.load(path)
+    tree.grow(2)
+    built = cy.CayleyTree(5,3)
+    assert list(tree.getNodes()) == list(built.getNodes())
+    assert np.array_equal(tree.edgeArray(),built.edgeArray())
+    assert tree.genReduce(np.ones(len(tree))).tolist() == \
+           built.genReduce(np.ones(len(built))).tolist()
+
+def test_growNetwork_extends_history():
+    random.seed(0)
+    monte = cy.MonteCarlo(cy.CayleyTree(3,3))
+    monte.randomDictionary()
+    monte.simulateNN()
+    before = monte.simArray().copy()
+    monte.growNetwork(state = 1)
+    assert monte.simArray().shape == (2,46)
+    assert np.array_equal(monte.simArray()[:,:22],before)
+    assert (monte.simArray()[:,22:] == 1).all()
@@ -0,0 +1,47 @@
+"""
+Filename: test_features.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that the FeatureStore columns read like the dictionaries of node
+features they replaced.
+"""
+
+import numpy as np
+import Cayley as cy
+
+def test_features_match_dictionaries():
+    rng = np.random.default_rng(0)
+    graph = cy.Graph()
+    expected = dict()
+    for step in range(300):
+        node = int(rng.integers(40))
+        if rng.random() < 0.2 and node in graph.getNodes():
+            del graph.getNodeFeature('value')[node]
+            expected.pop(node,None)
+        else:
+            value = [1,2.5,'up'][int(rng.integers(3))]
+            graph.add(node,value = value)
+            expected[node] = value
+    view = graph.getNodeFeature('value')
+    assert dict(view) == expected
+    assert view.copy() == expected
+    assert len(view) == len(expected)
+
+def test_object_values_are_kept():
+    graph = cy.Graph()
+    graph.add('a',pos = (1,2))
+    graph.add('b',pos = [3,4])
+    graph.add('c',pos = 5)
+    pos = graph.getNodeFeature('pos')
+    assert pos['a'] == (1,2) and type(pos['a']) is tuple
+    assert pos['b'] == [3,4] and type(pos['b']) is list
+    assert pos['c'] == 5 and type(pos['c']) is int
+
+def test_columns_widen_for_new_values():
+    graph = cy.Graph()
+    graph.addMultipleNodes(range(4),state = 0)
+    assert graph.getFeatureArray('state').dtype.kind == 'i'
+    graph.add(2,state = 0.5)
+    assert graph.getFeatureArray('state').tolist() == [0,0,0.5,0]
+    graph.setFeature('state',np.arange(4)*2)
+    assert graph.getNodeFeature('state').copy() == {0: 0,1: 2,2: 4,3: 6}
@@ -0,0 +1,32 @@
+"""
+Filename: test_graph.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that graph equality and fingerprints do not depend on node order.
+"""
+
+import Cayley as cy
+
+LINKS = [('a','b'),('b','c'),('c','d'),('a','d')]
+
+def square(order):
+    """Returns the graph of LINKS with the nodes added in the given order."""
+    graph = cy.Graph()
+    for node in order:
+        graph.add(node,weight = ord(node))
+    for first,second in LINKS:
+        graph.linkCreator(first,second)
+    return graph
+
+def test_equality_ignores_node_order():
+    first,second = square('abcd'),square('dbca')
+    assert first == second
+    assert first.fingerprint() == second.fingerprint()
+    first.reorder()
+    assert first == second
+    assert first.fingerprint() == second.fingerprint()
+
+def test_equality_sees_links():
+    first,second = square('abcd'),square('abcd')
+    second.linkCreator('a','c')
+    assert first != second
@@ -0,0 +1,34 @@
+"""
+Filename: test_history.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that the History reads like the list of state dictionaries that
+MonteCarlo used to keep.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+from Cayley.history import History
+
+def test_history_matches_dictionaries():
+    network = cy.CayleyTree(3,3)
+    history = History(network,capacity = 1)
+    expected = list()
+    rng = np.random.default_rng(0)
+    for step in range(20): #grows the array several times
+        states = rng.integers(0,2,len(network))
+        history.append(states)
+        expected.append(dict(zip(network.getNodes(),states.tolist())))
+    assert len(history) == len(expected)
+    assert [view.copy() for view in history] == expected
+    assert dict(history[-1]) == expected[-1]
+    assert history.array().shape == (20,len(network))
+    with pytest.raises(IndexError):
+        history.row(20)
+
+def test_rows_are_read_only():
+    history = History(cy.CayleyTree(2,3))
+    history.append(np.zeros(10))
+    with pytest.raises(ValueError):
+        history.row(0)[0] = 1
@@ -0,0 +1,103 @@
+"""
+Filename: test_montecarlo.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the vectorized simulations against a loop over the nodes that draws
+the same random numbers.
+"""
+
+import math
+import random
+import numpy as np
+import pytest
+import Cayley as cy
+
+SEED = 5
+
+def loopStep(network,previous,probability,states):
+    """Returns the next states found one node at a time. probability takes
+    a node, its state and the sum of the states of its neighbors; a node
+    whose state is in states flips when its draw is at most the
+    probability."""
+    draws = np.random.default_rng(SEED).random(len(network))
+    following = list()
+    for node in network.getNodes():
+        row = network.indexOf(node)
+        n = int(previous[row])
+        s = sum(int(previous[network.indexOf(neighbor)])
+                for neighbor in network.neighborFinder(node))
+        flip = n in states and draws[row] <= probability(node,n,s)
+        following.append(states[1 - states.index(n)] if flip else n)
+    return following
+
+def networks():
+    """Returns networks backed by each kind of adjacency."""
+    return [cy.CayleyTree(4,3),cy.CayleyTree(5,3,implicit = True),
+            cy.Lattice(6,5,periodic = True,implicit = True),
+            cy.BarabasiAlbert(150,3,seed = 0)]
+
+@pytest.mark.parametrize('network',networks())
+def test_simulateNN_matches_loop(network):
+    random.seed(SEED)
+    monte = cy.MonteCarlo(network,alpha = 0.6,beta = 0.7,gamma = 0.2,
+                          seed = SEED)
+    monte.randomDictionary()
+    previous = monte.simArray(0)
+    monte.simulateNN()
+    assert monte.simArray(1).tolist() == loopStep(network,previous,
+        lambda node,n,s: 0.2*n + (1 - n)*0.6*0.7**s,(0,1))
+
+@pytest.mark.parametrize('network',networks())
+def test_simulateNN_with_function_matches_loop(network):
+    random.seed(SEED)
+    monte = cy.MonteCarlo(network,seed = SEED)
+    monte.randomDictionary()
+    previous = monte.simArray(0)
+    monte.simulateNN('a*(1-n)+s/10')
+    assert monte.simArray(1).tolist() == loopStep(network,previous,
+        lambda node,n,s: 0.5*(1 - n) + s//10,(0,1))
+
+@pytest.mark.parametrize('network',networks())
+def test_simulateTemp_matches_loop(network):
+    random.seed(SEED)
+    monte = cy.MonteCarlo(network,seed = SEED)
+    monte.randomSpins()
+    temps = np.random.default_rng(1).choice([0.5,2.0],len(network))
+    network.setFeature('temperature',temps)
+    previous = monte.simArray(0)
+    monte.simulateTemp(k = 2,J = 1.5)
+    assert monte.simArray(1).tolist() == loopStep(network,previous,
+        lambda node,n,s: 0.5*(1 - n*math.tanh(
+            0.5*temps[network.indexOf(node)]*1.5*s)),(-1,1))
+
+@pytest.mark.parametrize('network',networks())
+def test_simulateVote_matches_loop(network):
+    random.seed(SEED)
+    monte = cy.MonteCarlo(network,alpha = 0.4,gamma = 0.3,seed = SEED)
+    monte.randomDictionary()
+    rng = np.random.default_rng(2)
+    betas = rng.choice([0.5,0.9],len(network))
+    phis = rng.choice([0.2,0.6],len(network))
+    network.setFeature('beta',betas)
+    network.setFeature('phi',phis)
+    previous = monte.simArray(0)
+    monte.simulateVote()
+    def probability(node,n,s):
+        row = network.indexOf(node)
+        unsum = len(network.neighborFinder(node)) - s
+        return 0.3*n*phis[row]**unsum + (1 - n)*0.4*betas[row]**s
+    assert monte.simArray(1).tolist() == \
+           loopStep(network,previous,probability,(0,1))
+
+def test_tables_follow_column_writes():
+    network = cy.CayleyTree(5,3)
+    monte = cy.MonteCarlo(network,seed = SEED)
+    monte.startUp()
+    network.setFeature('temperature',-5)
+    monte.simulateTemp()
+    network.getFeatureArray('temperature')[:] = 5 #does not change the version
+    previous = monte.simArray(-1)
+    monte.rng = np.random.default_rng(SEED) #the draws of loopStep
+    monte.simulateTemp()
+    assert monte.simArray(-1).tolist() == loopStep(network,previous,
+        lambda node,n,s: 0.5*(1 - n*math.tanh(5*s)),(-1,1))
@@ -0,0 +1,37 @@
+"""
+Filename: test_network.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the bulk node and feature methods of AbstractNetwork.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+
+@pytest.mark.parametrize('network',[cy.CayleyTree(3,3),
+                                    cy.CayleyTree(3,3,implicit = True),
+                                    cy.HyperLattice((3,4))])
+def test_indicesOf_takes_any_iterable(network):
+    assert network.indicesOf(network).tolist() == list(range(len(network)))
+    assert network.indicesOf([4,1]).tolist() == [4,1]
+    assert sorted(network.indicesOf({1,2,5}).tolist()) == [1,2,5]
+    assert network.indicesOf(node for node in (3,0)).tolist() == [3,0]
+    assert network.indicesOf([]).tolist() == []
+    with pytest.raises(KeyError):
+        network.indicesOf([len(network)])
+
+@pytest.mark.parametrize('implicit',(False,True))
+def test_temperature_on_whole_network(implicit):
+    tree = cy.CayleyTree(3,3,implicit = implicit)
+    cy.MonteCarlo(tree).temperature(tree,1.5)
+    assert tree.getFeatureArray('temperature').tolist() == [1.5]*len(tree)
+
+def test_addMultipleNodes_matches_add():
+    bulk,single = cy.Graph(),cy.Graph()
+    bulk.addMultipleNodes(['a','b','c'],state = 1,size = np.array([1,2,3]))
+    for node,size in zip('abc',(1,2,3)):
+        single.add(node,state = 1,size = size)
+    for name in ('state','size'):
+        assert bulk.getNodeFeature(name).copy() == \
+               single.getNodeFeature(name).copy()
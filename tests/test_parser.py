@@ -0,0 +1,50 @@
+"""
+Filename: test_parser.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the compiled probability functions against the Evaluator.
+"""
+
+import numpy as np
+import pytest
+from Cayley.parser import (Scanner, Translator, Evaluator, compileFunction,
+                           evaluator, arrayEvaluator)
+
+EXPRESSIONS = ['g*n+(1-n)*a*(b^s)','a^b^2','7/2+s','(a+b)*(s-n)%3',
+               '2^s*a/b','a-b-s','a/b*s','s^2^1']
+
+def evaluate(function,**values):
+    """Returns the value of the function by plugging in the values and
+    running the Evaluator, as the parser did before it was compiled."""
+    for name,value in values.items():
+        function = function.replace(name,str(value))
+    return Evaluator(Translator(Scanner(function)).translate()).evaluate()
+
+@pytest.mark.parametrize('function',EXPRESSIONS)
+def test_compiled_matches_evaluator(function):
+    for s in range(4):
+        for n in (0,1):
+            values = dict(a = 0.5,b = 0.8,g = 0.1,s = s,n = n)
+            assert compileFunction(function)(**values) == \
+                   pytest.approx(evaluate(function,**values))
+            assert evaluator(function,**values) == \
+                   pytest.approx(evaluate(function,**values))
+
+@pytest.mark.parametrize('function',EXPRESSIONS)
+def test_arrays_match_scalars(function):
+    s = np.array([0,1,2,3,3,0])
+    n = np.array([0,1,0,1,0,1])
+    values = arrayEvaluator(function,a = 0.5,b = 0.8,g = 0.1,s = s,n = n)
+    assert values.shape == s.shape
+    assert values.tolist() == pytest.approx(
+        [compileFunction(function)(a = 0.5,b = 0.8,g = 0.1,s = x,n = y)
+         for x,y in zip(s.tolist(),n.tolist())])
+
+def test_compiled_functions_are_cached():
+    assert compileFunction('a*s+b') is compileFunction('a*s+b')
+
+def test_errors():
+    with pytest.raises(ValueError):
+        compileFunction('a+')
+    with pytest.raises(ZeroDivisionError):
+        arrayEvaluator('a/s',a = 1.0,s = np.array([1,0]))
@@ -0,0 +1,32 @@
+"""
+Filename: test_randomgraphs.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks the random graphs: the base class is abstract, a seed gives the same
+graph and the links are simple.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+
+GRAPHS = [lambda seed: cy.ErdosRenyi(300,0.05,seed = seed),
+          lambda seed: cy.ErdosRenyi(40,0.8,seed = seed),
+          lambda seed: cy.BarabasiAlbert(300,3,seed = seed),
+          lambda seed: cy.WattsStrogatz(300,4,0.2,seed = seed),
+          lambda seed: cy.RandomRegular(300,4,seed = seed)]
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        cy.RandomGraph(10)
+
+@pytest.mark.parametrize('make',GRAPHS)
+def test_seed_gives_same_graph(make):
+    assert np.array_equal(make(7).edgeArray(),make(7).edgeArray())
+    assert make(7) == make(7)
+
+@pytest.mark.parametrize('make',GRAPHS)
+def test_links_are_simple(make):
+    edges = make(3).edgeArray()
+    assert (edges[:,0] < edges[:,1]).all()
+    assert len(np.unique(edges,axis = 0)) == len(edges)
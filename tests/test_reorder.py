@@ -0,0 +1,42 @@
+"""
+Filename: test_reorder.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that reorder() moves only the ids: names, links and features stay
+with their nodes.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+
+@pytest.mark.parametrize('method',('bfs','rcm'))
+def test_reorder_keeps_links_and_features(method):
+    network = cy.WattsStrogatz(200,4,0.3,seed = 2)
+    network.setFeature('weight',np.arange(len(network))*1.5)
+    links = {frozenset(link) for link in network.linksAsTuples()}
+    weights = network.getNodeFeature('weight').copy()
+    order = network.reorder(method)
+    assert sorted(order.tolist()) == list(range(len(network)))
+    assert {frozenset(link) for link in network.linksAsTuples()} == links
+    assert network.getNodeFeature('weight').copy() == weights
+    assert network.adjacency().bandwidth() <= \
+           cy.WattsStrogatz(200,4,0.3,seed = 2).adjacency().bandwidth()
+
+def test_originalOrder_undoes_reorder():
+    tree = cy.CayleyTree(5,3)
+    before = tree.adjacency().neighborSums(np.arange(len(tree)))
+    tree.reorder()
+    names = np.array(tree.getNodes()) #the id each node had before
+    sums = tree.adjacency().neighborSums(names)
+    assert np.array_equal(tree.originalOrder(sums),before)
+
+def test_load_keeps_reorder_permutation(tmp_path):
+    tree = cy.CayleyTree(4,3)
+    tree.reorder()
+    path = str(tmp_path/"tree.npz")
+    tree.save(path)
+    loaded = cy.CayleyTree.load(path)
+    values = np.arange(len(tree))
+    assert np.array_equal(loaded.originalOrder(values),tree.originalOrder(values))
+    assert sorted(loaded.generationView(1).getNodes()) == [1,2,3]
@@ -0,0 +1,35 @@
+"""
+Filename: test_storage.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that save and load give back the same network.
+"""
+
+import numpy as np
+import pytest
+import Cayley as cy
+
+def networks():
+    """Returns networks with each kind of topology and a feature."""
+    graph = cy.Graph()
+    graph.addMultipleNodes(['a','b','c','d'],state = 1)
+    graph.linkCreator('a','b')
+    graph.linkCreator('c','b')
+    tree = cy.CayleyTree(4,3,implicit = True)
+    tree.setFeature('state',np.arange(len(tree)) % 2)
+    lattice = cy.Lattice(5,4,periodic = True,implicit = True)
+    lattice.setFeature('temperature',0.5)
+    return {'graph': graph,'tree': tree,'lattice': lattice,
+            'random': cy.WattsStrogatz(100,4,0.1,seed = 1)}
+
+@pytest.mark.parametrize('mmap',(False,True))
+@pytest.mark.parametrize('name',sorted(networks()))
+def test_load_gives_same_network(tmp_path,name,mmap):
+    network = networks()[name]
+    path = str(tmp_path/"network.npz")
+    network.save(path)
+    loaded = type(network).load(path,mmap = mmap)
+    assert type(loaded) is type(network)
+    assert list(loaded.getNodes()) == list(network.getNodes())
+    assert np.array_equal(loaded.edgeArray(),network.edgeArray())
+    assert loaded.fingerprint() == network.fingerprint()
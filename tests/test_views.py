@@ -0,0 +1,40 @@
+"""
+Filename: test_views.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Checks that the views of a tree pick the right nodes, also after reorder(),
+and that a MonteCarlo simulation and its analysis run on a view.
+"""
+
+import pytest
+import Cayley as cy
+
+def views(tree):
+    """Returns a generation view and a subtree view of the tree."""
+    return {'generation': tree.generationView(2),'subtree': tree.subtreeView(1)}
+
+@pytest.mark.parametrize('implicit',(False,True))
+def test_views_survive_reorder(implicit):
+    tree = cy.CayleyTree(4,3,implicit = implicit)
+    before = {name: sorted(view.getNodes()) for name,view in views(tree).items()}
+    tree.reorder()
+    after = {name: sorted(view.getNodes()) for name,view in views(tree).items()}
+    assert after == before
+    assert sorted(tree.generationView(1).getNodes()) == [1,2,3]
+
+@pytest.mark.parametrize('implicit',(False,True))
+@pytest.mark.parametrize('name',('generation','subtree'))
+def test_sendExcel_on_view(tmp_path,implicit,name):
+    openpyxl = pytest.importorskip('openpyxl')
+    view = views(cy.CayleyTree(4,3,implicit = implicit))[name]
+    monte = cy.MonteCarlo(view,seed = 0)
+    monte.startUp()
+    monte.simulateNN()
+    path = str(tmp_path/"view.xlsx")
+    monte.sendExcel(path)
+    sheet = openpyxl.load_workbook(path)["Monte Carlo Data"]
+    nodes = list(view.getNodes())
+    assert [sheet.cell(row+2,1).value for row in range(len(nodes))] == \
+           ["Node " + str(node) for node in nodes]
+    assert [sheet.cell(row+2,3).value for row in range(len(nodes))] == \
+           [monte.simData(1)[node] for node in nodes]
@@ -0,0 +1,74 @@
+"""
+Filename: views.py
+Project: Research for Irina Mazilu, Ph.D.
+
+Contains the NetworkView class, a network made of a subset of the nodes of
+another network, such as one generation or one branch of a Cayley Tree or
+one floor of a Lattice. A view copies neither the links nor the features of
+the network it comes from: its links are a SubAdjacency of the parent's
+adjacency and its features are a FeatureSubset of the parent's columns, so
+states set while simulating on a view are states of the parent.
+"""
+
+__all__ = ['NetworkView']
+
+from Cayley.abstractnetwork import *
+from Cayley.adjacency import SubAdjacency
+from Cayley.features import FeatureSubset
+import numpy as np
+
+class NetworkView(AbstractNetwork):
+    """A view of the nodes of a parent network with the given ids. rows is
+    a range or slice of consecutive ids, an array of ids, or a boolean mask
+    over the ids. The links of the view are the links of the parent among
+    those nodes, as they were when the view was made, and are read-only."""
+
+    def __init__(self,parent,rows):
+        """Creates the view of the rows of the parent."""
+        if isinstance(rows,range) and rows.step == 1:
+            rows = slice(rows.start,rows.stop)
+        if isinstance(rows,slice):
+            rows = slice(*rows.indices(len(parent))[:2])
+        else:
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            rows = rows.astype(np.int64)
+        self.parent = parent
+        self.rows = rows
+        AbstractNetwork.__init__(self)
+        adjacency = SubAdjacency(parent.adjacency(),rows)
+        if isinstance(rows,slice):
+            self.nodes = parent.nodes[rows] #a range stays a range
+        else:
+            self.nodes = [parent.nodes[row] for row in rows.tolist()]
+        self.keys = self.nodes
+        if isinstance(rows,slice) and isinstance(parent._index,RangeIndex):
+            self._index = RangeIndex(len(adjacency),
+                                     parent._index.start + rows.start)
+        else:
+            self._index = {node: row for row,node in enumerate(self.nodes)}
+        self.features = FeatureSubset(parent.features,rows,len(adjacency))
+        self._adjacency = adjacency
+
+    def __eq__(self,other):
+        """Two views are equal when they show the same nodes of the same
+        network."""
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return self.parent is other.parent and \
+               np.array_equal(self.parentRows(),other.parentRows())
+
+    def getType(self):
+        """Quick fix for MonteCarlo."""
+        return "NetworkView"
+
+    def nodeNumber(self):
+        """Returns the number of nodes in the view."""
+        return len(self.nodes)
+
+    def parentRows(self):
+        """Returns an array with the id in the parent of every node."""
+        return self._adjacency.parentRows()
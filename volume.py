@@ -25,7 +25,8 @@ from change_me import temp_d
 def simulate(method, generations, links, alpha, beta, gamma, mu, r1, r2, trials,k,J):
     """The important one"""
     generations = generations + 1 ## #
-    network = cy.CayleyTree(generations, links)
+    #built once per (generations, links) and shared by every call of a sweep
+    network = cy.sharedNetwork(cy.CayleyTree, generations, links)
     monte = cy.MonteCarlo(network, alpha, beta, gamma, mu, r1, r2)
     run_time = time.time()
     endcol = xl.utility.xl_col_to_name(timesteps+1)
@@ -111,8 +112,9 @@ def simulate(method, generations, links, alpha, beta, gamma, mu, r1, r2, trials,
 
         for y in range(monte.getTimesteps()): #JKP: Follows new updates
             sum_t = 0 # Sum of relevant nodes at one timestep
+            states = monte.simData(y)
             for x in range(total_nodes[generations-1][links]): ## # gives adjusted, can't use len(monte.network)
-                sum_t += monte.simData(y)[x] #JKP: Follows new updates
+                sum_t += states[x] #JKP: Follows new updates
             dens_t = sum_t/total_nodes[generations-1][links] ## # Density at one timestep
             density_list[i][y] = dens_t
 
@@ -124,8 +126,9 @@ def simulate(method, generations, links, alpha, beta, gamma, mu, r1, r2, trials,
             for y in range(monte.getTimesteps()): #JKP: Follows new updates
                 worksheet.write(0,y+1,str(y))
             for y in range(monte.getTimesteps()): #JKP: Follows new updates
+                states = monte.simData(y)
                 for x in range(total_nodes[generations-1][links]):
-                    worksheet.write(x+1,y+1,monte.simData(y)[x]) #JKP: Follows new updates
+                    worksheet.write(x+1,y+1,states[x]) #JKP: Follows new updates
 
             worksheet2 = workbook.add_worksheet("Density trial %d" % (i+1))
             worksheet2.write(0,0,"Timestep")
@@ -135,8 +138,9 @@ def simulate(method, generations, links, alpha, beta, gamma, mu, r1, r2, trials,
             for y in range(timesteps+1):
                 worksheet2.write(0,y+1,str(y))
             for y in range(monte.getTimesteps()): #JKP: Follows new updates
+                states = monte.simData(y) #densities are kept per view
                 for x in range(network.generations+1): #JKP: Follows new updates
-                    worksheet2.write(x+1,y+1,monte.density(x,monte.simData(y)))
+                    worksheet2.write(x+1,y+1,monte.density(x,states))
                 worksheet2.write(network.generations+1,y+1,density_list[i][y]) ## #
 
         if (trials >= 100) and ((10*i)%trials == 0):
@@ -185,12 +189,11 @@ def simulate(method, generations, links, alpha, beta, gamma, mu, r1, r2, trials,
     overall.write(0,1,"Average")
     overall.write(0,2,"Std Dev")
 
-    for x in range(generations):
-        if x == 0:
-            for y in range(trials):
+    for y in range(trials): #trial outside so each state is reduced once
+        for x in range(generations):
+            if x == 0:
                 dens_collect[y][x] = monte.density(x,state_collect[y])
-        else:
-            for y in range(trials):
+            else:
                 dens_collect[y][x] = monte.density(x,state_collect[y])/ \
                                      ((links)*(links-1)**(x-1))
 